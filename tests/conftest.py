@@ -0,0 +1,7 @@
+"""テストの共通設定。"""
+
+import sys
+from pathlib import Path
+
+# toolsのスクリプトはパッケージではないため、実行時と同様にディレクトリをインポートパスに追加する
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
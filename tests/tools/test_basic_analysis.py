@@ -0,0 +1,168 @@
+"""tools/basic_analysis.py のテスト。"""
+
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import basic_analysis
+from _common import FAST_IO_ENV, load_data, load_head
+from basic_analysis import _compute_report, _count_duplicates, _find_high_corr_pairs, _split_dtypes, _to_arrow_table
+
+
+def _count_with_arrow(df: pd.DataFrame) -> int:
+    table = _to_arrow_table(df)
+    assert table is not None
+    return _count_duplicates(df, table)
+
+
+def test_count_duplicates_matches_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "i": rng.integers(0, 5, size=2000),
+            "f": rng.integers(0, 3, size=2000).astype(float),
+            "s": rng.choice(["a", "b", None], size=2000),
+        }
+    )
+    df.loc[::11, "f"] = np.nan
+
+    assert _count_with_arrow(df) == int(df.duplicated().sum())
+
+
+@pytest.mark.parametrize(
+    "values, dtype",
+    [
+        ([0.0, -0.0], "float64"),
+        ([0.0, -0.0], "float32"),
+        ([None, np.nan], object),
+        ([None, None, np.nan], object),
+        ([np.nan, np.nan], object),
+        ([pd.NA, np.nan, "a"], object),
+        ([np.nan, np.nan], "float64"),
+    ],
+)
+def test_count_duplicates_edge_cases_match_pandas(values, dtype):
+    df = pd.DataFrame({"x": pd.Series(values, dtype=dtype)})
+
+    assert _count_with_arrow(df) == int(df.duplicated().sum())
+
+
+def test_count_duplicates_without_table_uses_pandas():
+    df = pd.DataFrame({"x": [[1], [1], [2]]})
+
+    assert _count_duplicates(df, None) == 1
+
+
+def test_split_dtypes_matches_select_dtypes():
+    df = pd.DataFrame(
+        {
+            "i": [1, 2],
+            "f": [1.0, 2.0],
+            "t": pd.to_timedelta([1, 2], unit="s"),
+            "b": [True, False],
+            "ni": pd.array([1, None], dtype="Int64"),
+            "nb": pd.array([True, None], dtype="boolean"),
+            "d": pd.to_datetime(["2020-01-01", "2020-01-02"]),
+            "o": ["x", "y"],
+            "c": pd.Categorical(["x", "y"]),
+        }
+    )
+    numeric_mask, categorical_mask = _split_dtypes(df.dtypes)
+
+    assert list(df.columns[numeric_mask]) == list(df.select_dtypes(include=["number"]).columns)
+    assert list(df.columns[categorical_mask]) == list(df.select_dtypes(include=["object", "category"]).columns)
+
+
+def test_find_high_corr_pairs_returns_lower_triangle_in_row_order():
+    columns = ["a", "b", "c"]
+    corr = pd.DataFrame([[1.0, 0.9, -0.8], [0.9, 1.0, 0.1], [-0.8, 0.1, 1.0]], index=columns, columns=columns)
+
+    assert _find_high_corr_pairs(corr, 0.7) == [("b", "a", 0.9), ("c", "a", -0.8)]
+
+
+def test_find_high_corr_pairs_numba_path_matches_numpy(monkeypatch):
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(0)
+    arr = rng.uniform(-1, 1, size=(40, 40))
+    columns = [f"c{i}" for i in range(40)]
+    corr = pd.DataFrame((arr + arr.T) / 2, index=columns, columns=columns)
+
+    expected = _find_high_corr_pairs(corr, 0.5)
+    monkeypatch.setattr(basic_analysis, "NUMBA_MIN_COLUMNS", 0)
+
+    assert _find_high_corr_pairs(corr, 0.5) == expected
+
+
+@pytest.mark.parametrize("no_downcast, float_dtype, int_dtype", [(False, "float32", "int8"), (True, "float64", "int64")])
+def test_main_downcasts_unless_disabled(tmp_path, monkeypatch, capsys, no_downcast, float_dtype, int_dtype):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1.5,1\n2.5,2\n", encoding="utf-8")
+    argv = ["basic_analysis.py", str(path), "--no-cache"] + (["--no-downcast"] if no_downcast else [])
+    monkeypatch.setattr(sys, "argv", argv)
+
+    basic_analysis.main()
+
+    out = capsys.readouterr().out
+    assert re.search(rf"^a\s+{float_dtype}$", out, re.MULTILINE)
+    assert re.search(rf"^b\s+{int_dtype}$", out, re.MULTILINE)
+
+
+@pytest.mark.parametrize("encoding, fast_io", [("utf-8", False), ("shift-jis", False), ("utf-8", True)])
+def test_report_sections_for_csv_with_date_column(tmp_path, monkeypatch, encoding, fast_io):
+    if fast_io:
+        pytest.importorskip("polars")
+        monkeypatch.setenv(FAST_IO_ENV, "1")
+    else:
+        monkeypatch.delenv(FAST_IO_ENV, raising=False)
+    rows = ["date,time,value,category"] + [
+        f"2020-01-{day:02d},2020-01-{day:02d} 10:00:00,{day * 1.5},{'東京' if day % 2 else '大阪'}" for day in range(1, 11)
+    ]
+    path = tmp_path / "dates.csv"
+    path.write_bytes(("\n".join(rows) + "\n").encode(encoding))
+
+    df = load_data(str(path))
+    report = _compute_report(df)
+
+    # 読み込み方法や文字コードによらず、日付の列はカテゴリ列の基本統計量に表示される
+    assert list(report["describe_num"].columns) == ["value"]
+    assert list(report["describe_num"].index) == ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+    assert list(report["describe_cat"].columns) == ["date", "time", "category"]
+    assert report["describe_cat"].loc["unique", "date"] == 10
+    pd.testing.assert_series_equal(load_head(str(path), 3).dtypes, df.dtypes)
+
+
+def test_main_head_only_skips_full_load(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n" + "".join(f"{i},x{i}\n" for i in range(10)), encoding="utf-8")
+    monkeypatch.setattr(basic_analysis, "load_data", lambda *args, **kwargs: pytest.fail("全体を読み込んでいます"))
+    monkeypatch.setattr(sys, "argv", ["basic_analysis.py", str(path), "--head-only", "--head", "2"])
+
+    basic_analysis.main()
+
+    out = capsys.readouterr().out
+    assert "=== データの先頭 2 行 ===" in out
+    assert "x1" in out and "x2" not in out
+    assert "エラー" not in out
+
+
+def test_main_head_only_with_output_loads_full_file(tmp_path, monkeypatch):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n3,4\n", encoding="utf-8")
+    output = tmp_path / "report.txt"
+    calls = []
+    load = basic_analysis.load_data
+
+    def counting_load_data(*args, **kwargs):
+        calls.append(args)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(basic_analysis, "load_data", counting_load_data)
+    monkeypatch.setattr(sys, "argv", ["basic_analysis.py", str(path), "--head-only", "--no-cache", "-o", str(output)])
+
+    basic_analysis.main()
+
+    assert len(calls) == 1
+    assert "=== 重複行の数: 0 ===" in output.read_text(encoding="utf-8")
@@ -0,0 +1,302 @@
+"""tools/_common.py のテスト。"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import _common
+from _common import FAST_IO_ENV, downcast, fast_corr, load_data, load_head
+
+
+def _sample_frame(n: int = 5000) -> pd.DataFrame:
+    """相関のある列と大きなオフセットを持つ列からなるデータフレームを作ります。"""
+    rng = np.random.default_rng(0)
+    w = rng.normal(size=n)
+    return pd.DataFrame(
+        {
+            "w": w,
+            "w2": w + rng.normal(size=n) * 0.75,
+            "noise": rng.normal(size=n),
+            "big": 1e7 + w,
+            "epoch": 1.7e9 + w * 1000,
+        }
+    )
+
+
+def test_fast_corr_matches_pandas():
+    df = _sample_frame()
+    np.testing.assert_allclose(fast_corr(df).to_numpy(), df.corr().to_numpy(), atol=1e-5)
+
+
+def test_fast_corr_keeps_precision_of_offset_columns():
+    df = _sample_frame()
+    corr = fast_corr(df)
+    expected = df.corr()
+
+    assert abs(corr.loc["w", "big"] - 1.0) < 1e-5
+    assert abs(corr.loc["w", "epoch"] - 1.0) < 1e-5
+    assert abs(corr.loc["w2", "big"] - expected.loc["w2", "big"]) < 1e-5
+
+
+def test_fast_corr_constant_column_is_nan():
+    df = _sample_frame().assign(const=3.0)
+    corr = fast_corr(df)
+
+    assert corr["const"].isna().all()
+    assert corr.loc["const"].isna().all()
+    assert np.isfinite(corr.drop(index="const", columns="const").to_numpy()).all()
+
+
+def test_fast_corr_with_missing_values_matches_pandas():
+    df = _sample_frame()
+    df.iloc[::7, 0] = np.nan
+    np.testing.assert_allclose(fast_corr(df).to_numpy(), df.corr().to_numpy())
+
+
+def test_downcast_shrinks_numeric_columns():
+    df = pd.DataFrame(
+        {
+            "f": [1.5, 2.5],
+            "i8": [1, 100],
+            "i16": [1, 200],
+            "i32": [-1, 40_000],
+            "ni": pd.array([1, None], dtype="Int64"),
+        }
+    )
+
+    result = downcast(df)
+
+    assert result.dtypes.to_dict() == {
+        "f": np.float32,
+        "i8": np.int8,
+        "i16": np.int16,
+        "i32": np.int32,
+        "ni": pd.Int8Dtype(),
+    }
+    assert result["i32"].tolist() == [-1, 40_000]
+
+
+def test_downcast_leaves_other_columns_untouched():
+    df = pd.DataFrame(
+        {
+            "b": [True, False],
+            "d": pd.to_datetime(["2020-01-01", "2020-01-02"]),
+            "o": ["x", "y"],
+            "c": pd.Categorical(["x", "y"]),
+        }
+    )
+    expected = df.dtypes.copy()
+
+    pd.testing.assert_series_equal(downcast(df).dtypes, expected)
+
+
+def test_downcast_handles_duplicate_column_names():
+    df = pd.DataFrame([[1.5, 2, "x"]], columns=["a", "a", "a"])
+
+    result = downcast(df)
+
+    assert result.dtypes.tolist() == [np.float32, np.int8, object]
+    assert result.iloc[0].tolist() == [1.5, 2, "x"]
+
+
+def test_load_data_detects_shift_jis_after_first_block(tmp_path):
+    # 先頭4KBはASCIIのみで、その後に日本語が現れるShift-JISのCSV
+    rows = ["id,name"] + [f"{i},abc" for i in range(1000)] + [f"{i},東京" for i in range(1000, 1010)]
+    path = tmp_path / "late.csv"
+    path.write_bytes(("\n".join(rows) + "\n").encode("shift-jis"))
+    assert b"\x93" not in path.read_bytes()[:4096]
+
+    df = load_data(str(path))
+
+    assert len(df) == 1010
+    assert df["name"].iloc[-1] == "東京"
+    assert load_head(str(path), 3)["name"].tolist() == ["abc", "abc", "abc"]
+
+
+@pytest.fixture
+def read_calls(monkeypatch):
+    """``_read_file`` が呼ばれた回数（キャッシュを使わずに読み込んだ回数）を記録します。"""
+    monkeypatch.delenv(FAST_IO_ENV, raising=False)
+    calls = []
+    read_file = _common._read_file
+
+    def counting_read_file(*args, **kwargs):
+        calls.append(args)
+        return read_file(*args, **kwargs)
+
+    monkeypatch.setattr(_common, "_read_file", counting_read_file)
+    return calls
+
+
+def _write_csv(path, rows: int = 3) -> None:
+    path.write_text("a,b\n" + "".join(f"{i},{i * 0.5}\n" for i in range(rows)), encoding="utf-8")
+
+
+def _cache_files(cache_dir) -> list:
+    return sorted(p.name for p in cache_dir.iterdir())
+
+
+def test_load_data_reads_from_cache_on_second_call(tmp_path, read_calls):
+    path = tmp_path / "data.csv"
+    _write_csv(path)
+    cache_dir = tmp_path / "cache"
+
+    first = load_data(str(path), cache_dir=str(cache_dir))
+    second = load_data(str(path), cache_dir=str(cache_dir))
+
+    assert len(read_calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert len(_cache_files(cache_dir)) == 1
+
+
+def test_load_data_without_cache_dir_does_not_cache(tmp_path, read_calls):
+    path = tmp_path / "data.csv"
+    _write_csv(path)
+
+    load_data(str(path))
+    load_data(str(path))
+
+    assert len(read_calls) == 2
+
+
+@pytest.mark.parametrize("change", ["mtime", "size"])
+def test_load_data_reloads_and_evicts_when_file_changes(tmp_path, read_calls, change):
+    path = tmp_path / "data.csv"
+    _write_csv(path)
+    cache_dir = tmp_path / "cache"
+    load_data(str(path), cache_dir=str(cache_dir))
+    old_cache = _cache_files(cache_dir)
+
+    stat = os.stat(path)
+    if change == "mtime":
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    else:
+        # 更新時刻は変えずにサイズだけを変える
+        _write_csv(path, rows=4)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    df = load_data(str(path), cache_dir=str(cache_dir))
+
+    assert len(read_calls) == 2
+    assert len(df) == (4 if change == "size" else 3)
+    new_cache = _cache_files(cache_dir)
+    assert len(new_cache) == 1
+    assert new_cache != old_cache
+
+
+def test_load_data_keeps_separate_cache_per_dtypes_and_reader(tmp_path, read_calls, monkeypatch):
+    path = tmp_path / "data.csv"
+    _write_csv(path)
+    cache_dir = tmp_path / "cache"
+    reader_name = _common._reader_name
+
+    load_data(str(path), cache_dir=str(cache_dir))
+    typed = load_data(str(path), cache_dir=str(cache_dir), dtypes={"a": "float64"})
+    monkeypatch.setattr(_common, "_reader_name", lambda file_ext: "polars")
+    load_data(str(path), cache_dir=str(cache_dir))
+
+    assert len(read_calls) == 3
+    assert typed["a"].dtype == np.float64
+    assert len(_cache_files(cache_dir)) == 3
+
+    # 読み込み方法を元に戻しても、それぞれのキャッシュが残っている
+    monkeypatch.setattr(_common, "_reader_name", reader_name)
+    load_data(str(path), cache_dir=str(cache_dir))
+    load_data(str(path), cache_dir=str(cache_dir), dtypes={"a": "float64"})
+
+    assert len(read_calls) == 3
+
+
+def test_load_data_continues_when_cache_cannot_be_saved(tmp_path, read_calls, monkeypatch, capsys):
+    path = tmp_path / "data.csv"
+    _write_csv(path)
+    cache_dir = tmp_path / "cache"
+
+    def failing_to_parquet(self, *args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", failing_to_parquet)
+    df = load_data(str(path), cache_dir=str(cache_dir))
+
+    assert len(df) == 3
+    assert "キャッシュの保存に失敗しました" in capsys.readouterr().out
+    # 書きかけの一時ファイルも残らない
+    assert _cache_files(cache_dir) == []
+
+
+def test_save_cache_uses_a_separate_temporary_file(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "data-0-1-2.parquet")
+    written = []
+    to_parquet = pd.DataFrame.to_parquet
+
+    def recording_to_parquet(self, path, *args, **kwargs):
+        written.append(path)
+        return to_parquet(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", recording_to_parquet)
+    df = pd.DataFrame({"a": [1, 2]})
+    _common._save_cache(df, cache_path)
+    _common._save_cache(df, cache_path)
+
+    assert len(set(written)) == 2
+    assert cache_path not in written
+    assert _cache_files(tmp_path) == ["data-0-1-2.parquet"]
+    pd.testing.assert_frame_equal(pd.read_parquet(cache_path), df)
+
+
+def _head_frame() -> pd.DataFrame:
+    return pd.DataFrame({"id": range(20), "name": [f"n{i}" for i in range(20)], "value": np.arange(20) * 0.5})
+
+
+def _write_head_file(path, df: pd.DataFrame) -> None:
+    if path.suffix == ".csv":
+        df.to_csv(path, index=False)
+    elif path.suffix == ".xlsx":
+        pytest.importorskip("openpyxl")
+        df.to_excel(path, index=False)
+    elif path.suffix == ".json":
+        df.to_json(path, orient="records")
+    else:
+        # 複数のrow groupに分けて、先頭のバッチだけを読むことを確認できるようにする
+        df.to_parquet(path, row_group_size=5)
+
+
+@pytest.mark.parametrize("ext", [".csv", ".xlsx", ".json", ".parquet"])
+@pytest.mark.parametrize("n", [0, 3, 50])
+def test_load_head_returns_first_rows(tmp_path, ext, n):
+    df = _head_frame()
+    path = tmp_path / f"data{ext}"
+    _write_head_file(path, df)
+
+    head = load_head(str(path), n)
+
+    assert list(head.columns) == list(df.columns)
+    pd.testing.assert_frame_equal(head.reset_index(drop=True), df.head(n).reset_index(drop=True), check_dtype=False)
+
+
+def test_load_head_reads_only_first_parquet_batch(tmp_path, monkeypatch):
+    df = _head_frame()
+    path = tmp_path / "data.parquet"
+    _write_head_file(path, df)
+    monkeypatch.setattr(pd, "read_parquet", lambda *args, **kwargs: pytest.fail("ファイル全体を読み込んでいます"))
+
+    assert load_head(str(path), 3)["id"].tolist() == [0, 1, 2]
+    assert load_head(str(path), 0).empty
+
+
+def test_load_head_applies_dtypes(tmp_path):
+    path = tmp_path / "data.csv"
+    _write_head_file(path, _head_frame())
+
+    assert load_head(str(path), 3, dtypes={"id": "float64"})["id"].dtype == np.float64
+
+
+def test_load_head_rejects_missing_and_unsupported_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_head(str(tmp_path / "missing.csv"), 3)
+
+    path = tmp_path / "data.txt"
+    path.write_text("a\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_head(str(path), 3)
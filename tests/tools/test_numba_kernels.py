@@ -0,0 +1,30 @@
+"""tools/_numba_kernels.py のテスト。"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+from _numba_kernels import threshold_pairs  # noqa: E402
+
+
+def test_threshold_pairs_matches_numpy_mask():
+    rng = np.random.default_rng(0)
+    corr = rng.uniform(-1, 1, size=(60, 60))
+    corr = (corr + corr.T) / 2
+    corr[3, :] = np.nan
+    corr[:, 3] = np.nan
+
+    i, j, values = threshold_pairs(corr, 0.6)
+
+    ei, ej = np.tril_indices(corr.shape[0], k=-1)
+    mask = np.abs(corr[ei, ej]) >= 0.6
+    np.testing.assert_array_equal(i, ei[mask])
+    np.testing.assert_array_equal(j, ej[mask])
+    np.testing.assert_array_equal(values, corr[ei, ej][mask])
+
+
+def test_threshold_pairs_without_matches_returns_empty_arrays():
+    i, j, values = threshold_pairs(np.eye(5), 0.5)
+
+    assert len(i) == len(j) == len(values) == 0
@@ -0,0 +1,289 @@
+"""tools/visualization.py のテスト。"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import visualization
+from visualization import _kde_curve, _lttb_downsample, _lttb_indices, _maybe_sample, _top_value_counts
+
+
+def test_lttb_indices_keeps_endpoints_and_order():
+    rng = np.random.default_rng(0)
+    x = np.arange(10_000, dtype=float)
+    y = rng.normal(size=10_000).cumsum()
+
+    indices = _lttb_indices(x, y, 500)
+
+    assert len(indices) == 500
+    assert indices[0] == 0
+    assert indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_indices_keeps_spikes():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[[123, 456, 789]] = [10.0, -10.0, 5.0]
+
+    indices = _lttb_indices(x, y, 50)
+
+    assert {123, 456, 789} <= set(indices.tolist())
+
+
+@pytest.mark.parametrize("n_out", [2, 100, 200])
+def test_lttb_indices_returns_all_points_when_not_reducing(n_out):
+    x = np.arange(100, dtype=float)
+
+    np.testing.assert_array_equal(_lttb_indices(x, x, n_out), np.arange(100))
+
+
+def test_lttb_downsample_drops_missing_values_and_keeps_timezone():
+    x = pd.Series(pd.date_range("2020-01-01", periods=5000, freq="min", tz="Asia/Tokyo"))
+    y = pd.Series(np.sin(np.arange(5000) / 100.0))
+    y.iloc[10] = np.nan
+
+    x_out, y_out = _lttb_downsample(x, y, 300)
+
+    assert len(x_out) == len(y_out) == 300
+    assert str(x_out.tz) == "Asia/Tokyo"
+    assert not np.isnan(y_out).any()
+
+
+def test_plot_time_series_uses_max_points_as_lttb_target(tmp_path, monkeypatch):
+    pytest.importorskip("matplotlib")
+    calls = []
+
+    def fake_downsample(x, y, n_out):
+        calls.append(n_out)
+        return _lttb_downsample(x, y, n_out)
+
+    monkeypatch.setattr(visualization, "_lttb_downsample", fake_downsample)
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=3000, freq="min"), "v": np.arange(3000.0)})
+
+    visualization.plot_time_series(df, "date", "v", output_path=str(tmp_path / "ts.png"), max_points=500)
+    visualization.plot_time_series(df, "date", "v", output_path=str(tmp_path / "ts.png"), max_points=5000)
+
+    assert calls == [500]
+
+
+def test_maybe_sample_keeps_small_frames_and_samples_large_ones():
+    df = pd.DataFrame({"a": np.arange(100)})
+
+    assert _maybe_sample(df, 100) is df
+    sampled = _maybe_sample(df, 10)
+    assert len(sampled) == 10
+    assert set(sampled["a"]) <= set(df["a"])
+    # 同じデータからは毎回同じ行を選ぶ
+    pd.testing.assert_frame_equal(sampled, _maybe_sample(df, 10))
+
+
+@pytest.mark.parametrize("max_points", [0, -1])
+def test_maybe_sample_is_disabled_by_non_positive_max_points(max_points):
+    df = pd.DataFrame({"a": np.arange(100)})
+
+    assert _maybe_sample(df, max_points) is df
+
+
+@pytest.fixture
+def scatter_calls(monkeypatch):
+    """``plot_scatter`` がサンプリングした列・行数と、密度図で描画したかを記録します。"""
+    plt = pytest.importorskip("matplotlib.pyplot")
+    calls = {"sampled": [], "hexbin": 0}
+    maybe_sample = visualization._maybe_sample
+    hexbin = plt.hexbin
+
+    def recording_maybe_sample(df, max_points):
+        calls["sampled"].append((list(df.columns), len(df), max_points))
+        return maybe_sample(df, max_points)
+
+    def recording_hexbin(*args, **kwargs):
+        calls["hexbin"] += 1
+        return hexbin(*args, **kwargs)
+
+    monkeypatch.setattr(visualization, "_maybe_sample", recording_maybe_sample)
+    monkeypatch.setattr(plt, "hexbin", recording_hexbin)
+    return calls
+
+
+def _scatter_frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {"x": rng.normal(size=n), "y": rng.normal(size=n), "g": rng.choice(["a", "b"], size=n), "other": np.arange(n)}
+    )
+
+
+def test_plot_scatter_samples_only_plotted_columns(tmp_path, scatter_calls):
+    df = _scatter_frame(500)
+
+    visualization.plot_scatter(df, "x", "y", output_path=str(tmp_path / "s.png"), max_points=100)
+    visualization.plot_scatter(df, "x", "y", hue="g", output_path=str(tmp_path / "s.png"), max_points=100)
+
+    assert scatter_calls["sampled"] == [(["x", "y"], 500, 100), (["x", "y", "g"], 500, 100)]
+    assert scatter_calls["hexbin"] == 0
+
+
+def test_plot_scatter_switches_to_hexbin_above_threshold(tmp_path, scatter_calls, monkeypatch):
+    monkeypatch.setattr(visualization, "HEXBIN_THRESHOLD", 200)
+
+    # 閾値ちょうどまではサンプリングした散布図
+    visualization.plot_scatter(_scatter_frame(200), "x", "y", output_path=str(tmp_path / "s.png"), max_points=100)
+    assert scatter_calls["hexbin"] == 0
+    assert len(scatter_calls["sampled"]) == 1
+
+    # 閾値を超えると全データの密度図（サンプリングしない）
+    visualization.plot_scatter(_scatter_frame(201), "x", "y", output_path=str(tmp_path / "s.png"), max_points=100)
+    assert scatter_calls["hexbin"] == 1
+    assert len(scatter_calls["sampled"]) == 1
+
+    # 色分けする場合は密度図にしない
+    visualization.plot_scatter(_scatter_frame(201), "x", "y", hue="g", output_path=str(tmp_path / "s.png"))
+    assert scatter_calls["hexbin"] == 1
+
+
+def test_plot_scatter_max_points_zero_draws_every_point(tmp_path, scatter_calls, monkeypatch):
+    monkeypatch.setattr(visualization, "HEXBIN_THRESHOLD", 200)
+
+    visualization.plot_scatter(_scatter_frame(500), "x", "y", output_path=str(tmp_path / "s.png"), max_points=0)
+
+    assert scatter_calls["hexbin"] == 0
+    assert scatter_calls["sampled"] == [(["x", "y"], 500, 0)]
+
+
+def test_plot_pairplot_samples_only_plotted_columns(tmp_path, scatter_calls):
+    df = _scatter_frame(300)
+
+    visualization.plot_pairplot(df, columns=["x", "y"], hue="g", output_path=str(tmp_path / "p.png"), max_points=50)
+
+    assert scatter_calls["sampled"] == [(["x", "y", "g"], 300, 50)]
+
+
+def _count_series():
+    rng = np.random.default_rng(0)
+    tied = pd.Series(list("abcdefghijkl") * 3 + ["z"] * 5, name="tied")
+    shuffled = pd.Series(rng.permutation(tied.to_numpy()), name="shuffled")
+    ints = pd.Series(rng.integers(0, 30, size=500), name="ints")
+    with_nan = pd.Series(rng.choice(["x", "y", "z", None], size=200), name="with_nan")
+    categorical = pd.Series(pd.Categorical(list("bbaac"), categories=list("xcba")), name="categorical")
+    many_categories = pd.Series(pd.Categorical(rng.choice(list("abcdefghijklmn"), size=100)), name="many")
+    return [tied, shuffled, ints, with_nan, categorical, many_categories, pd.Series([], dtype=object, name="empty")]
+
+
+@pytest.mark.parametrize("series", _count_series(), ids=lambda s: s.name)
+def test_top_value_counts_matches_value_counts(series):
+    expected = series.value_counts()
+
+    top, n_values = _top_value_counts(series, 10)
+
+    # value_countsは同じ度数の値の順序が一定しないため、度数の並びと各値の度数を比べる
+    np.testing.assert_array_equal(top.to_numpy(), expected.head(10).to_numpy())
+    pd.testing.assert_series_equal(top, expected.loc[top.index])
+    assert n_values == len(expected)
+
+
+def test_top_value_counts_orders_ties_by_first_appearance():
+    series = pd.Series(list("abcdefghijkl") * 3 + ["z"] * 5)
+
+    top, _ = _top_value_counts(series, 10)
+
+    assert top.index.tolist() == ["z", "a", "b", "c", "d", "e", "f", "g", "h", "i"]
+
+
+def test_plot_count_draws_top_values(tmp_path, monkeypatch):
+    plt = pytest.importorskip("matplotlib.pyplot")
+    monkeypatch.setattr(visualization, "_import_seaborn", lambda: None)
+    drawn = []
+    bar = plt.bar
+
+    def recording_bar(x, height, *args, **kwargs):
+        drawn.append((list(x), list(height)))
+        return bar(x, height, *args, **kwargs)
+
+    monkeypatch.setattr(plt, "bar", recording_bar)
+    df = pd.DataFrame({"c": list("abcdefghijkl") * 3 + ["z"] * 5})
+
+    visualization.plot_count(df, "c", output_path=str(tmp_path / "c.png"))
+
+    assert drawn == [(["z", "a", "b", "c", "d", "e", "f", "g", "h", "i"], [5] + [3] * 9)]
+
+
+def _integrate(x: np.ndarray, y: np.ndarray) -> float:
+    """台形公式で曲線の下の面積を求めます。"""
+    return float(np.sum((y[1:] + y[:-1]) / 2 * np.diff(x)))
+
+
+def _kde_both(values: np.ndarray, monkeypatch):
+    """KDEpyを使った場合と使わない場合の密度曲線を計算します。"""
+    pytest.importorskip("KDEpy")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        kdepy_curve = _kde_curve(values)
+    with monkeypatch.context() as m:
+        m.setattr(visualization, "import_optional", lambda name: None)
+        fallback_curve = _kde_curve(values)
+    return kdepy_curve, fallback_curve
+
+
+@pytest.mark.parametrize(
+    "values",
+    [np.random.default_rng(0).normal(size=5000), np.array([1.0] * 100 + [2.0])],
+    ids=["normal", "zero_iqr"],
+)
+def test_kde_curve_matches_between_kdepy_and_fallback(values, monkeypatch):
+    (grid, density), (fallback_grid, fallback_density) = _kde_both(values, monkeypatch)
+
+    # 四分位範囲が0でも、どちらも標準偏差から決めた同じバンド幅を使う
+    assert abs(density.max() - fallback_density.max()) < 0.02 * density.max()
+    np.testing.assert_allclose(np.interp(fallback_grid, grid, density), fallback_density, atol=0.02 * density.max())
+    for x, y in [(grid, density), (fallback_grid, fallback_density)]:
+        assert abs(_integrate(x, y) - 1.0) < 1e-3
+
+
+def test_kde_curve_with_zero_iqr_follows_the_data_scale(monkeypatch):
+    values = np.array([1.0] * 100 + [2.0])
+    monkeypatch.setattr(visualization, "import_optional", lambda name: None)
+
+    grid, density = _kde_curve(values)
+
+    # ほぼすべての点が1.0にあるため、密度は1.0付近に鋭いピークを持つ
+    assert density.max() > 5
+    assert abs(grid[np.argmax(density)] - 1.0) < 0.05
+
+
+@pytest.mark.parametrize("values", [np.full(10, 3.0), np.array([1.0]), np.array([])], ids=["constant", "one", "empty"])
+def test_kde_curve_returns_none_without_spread(values):
+    assert _kde_curve(values) is None
+
+
+def test_plot_histogram_draws_counts_and_scaled_density(tmp_path, monkeypatch):
+    plt = pytest.importorskip("matplotlib.pyplot")
+    drawn = {}
+    bar, plot = plt.bar, plt.plot
+
+    def recording_bar(x, height, *args, **kwargs):
+        drawn["bar"] = np.asarray(height)
+        return bar(x, height, *args, **kwargs)
+
+    def recording_plot(x, y, *args, **kwargs):
+        drawn["plot"] = (np.asarray(x), np.asarray(y))
+        return plot(x, y, *args, **kwargs)
+
+    monkeypatch.setattr(plt, "bar", recording_bar)
+    monkeypatch.setattr(plt, "plot", recording_plot)
+    values = np.random.default_rng(0).normal(size=2000)
+    df = pd.DataFrame({"v": np.append(values, np.nan)})
+
+    visualization.plot_histogram(df, "v", bins=20, output_path=str(tmp_path / "h.png"))
+
+    counts, edges = np.histogram(values, bins=20)
+    np.testing.assert_array_equal(drawn["bar"], counts)
+    # 密度曲線は度数のスケールに合わせて描画される
+    grid, curve = drawn["plot"]
+    assert abs(_integrate(grid, curve) - counts.sum() * np.diff(edges).mean()) < 0.01 * counts.sum()
+
+
+def test_plot_histogram_rejects_non_numeric_column():
+    with pytest.raises(ValueError):
+        visualization.plot_histogram(pd.DataFrame({"s": ["a", "b"]}), "s")
@@ -0,0 +1,605 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+データ分析ツールで共通して使う関数をまとめたモジュール。
+
+``basic_analysis.py`` と ``visualization.py`` の両方から使う、データファイルの読み込み・
+キャッシュ・データ型の縮小・相関行列の計算を提供します。
+スクリプトと同じディレクトリに置かれているため、各スクリプトからそのままインポートできます。
+"""
+
+import codecs
+import datetime
+import glob
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import chardet
+except ImportError:
+    chardet = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Polarsによる高速読み込みを有効にする環境変数
+FAST_IO_ENV = "LLMDL_FAST_IO"
+
+# 読み込んだデータのキャッシュを保存するデフォルトのディレクトリ
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "llm-data-lab")
+
+# chardetの判定結果をそのまま使う日本語の文字コード
+JAPANESE_ENCODINGS = ("shift_jis", "cp932", "euc_jp", "iso_2022_jp")
+
+
+@lru_cache(maxsize=None)
+def import_optional(name: str) -> Optional[ModuleType]:
+    """オプションのパッケージを必要になった時点でインポートします。
+
+    polars・numba・scipyはインポートだけで0.1〜0.2秒かかるため、
+    モジュールの先頭ではなく、使う処理に入ったときに呼び出します。
+
+    Args:
+        name: モジュール名。
+
+    Returns:
+        モジュール。インストールされていない場合はNone。
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _use_fast_io() -> bool:
+    """Polarsによる高速読み込みを使用するかどうかを判定します。
+
+    Returns:
+        環境変数 ``LLMDL_FAST_IO=1`` が設定され、polarsが利用可能な場合はTrue。
+    """
+    return os.environ.get(FAST_IO_ENV) == "1" and import_optional("polars") is not None
+
+
+def _guess_encoding(sample: bytes) -> str:
+    """UTF-8として解釈できないバイト列のエンコーディングを推定します。
+
+    日本語の文字が少ないとchardetは西欧の文字コードと誤判定しやすいため、
+    chardetが日本語の文字コードと判定して実際に解釈できる場合はその結果を使い、
+    それ以外でShift-JIS（cp932）として解釈できる場合はcp932とします。
+
+    Args:
+        sample: 判定するバイト列。末尾で途切れたマルチバイト文字は無視します。
+
+    Returns:
+        推定したエンコーディング。推定できない場合は ``"shift-jis"``。
+    """
+    detected = chardet.detect(sample)["encoding"] if chardet is not None else None
+
+    # cp932はShift-JISにWindowsの機種依存文字（①や㈱など）を加えた上位互換
+    candidates = ["cp932"]
+    if detected and detected.lower().replace("-", "_") in JAPANESE_ENCODINGS:
+        candidates.insert(0, detected)
+    for encoding in candidates:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample)
+            return encoding
+        except UnicodeDecodeError:
+            pass
+
+    if detected and detected.lower() not in ("ascii", "utf-8"):
+        return detected
+    return "shift-jis"
+
+
+def _detect_encoding(file_path: str) -> Optional[str]:
+    """CSVファイルの先頭4KBからエンコーディングを推定します。
+
+    Args:
+        file_path: データファイルのパス。
+
+    Returns:
+        推定したエンコーディング。UTF-8として読める場合はNone。
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(4096)
+
+    try:
+        # 末尾で途切れたマルチバイト文字は無視して判定する
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return None
+    except UnicodeDecodeError:
+        pass
+
+    return _guess_encoding(head)
+
+
+def _fallback_encoding(file_path: str) -> str:
+    """UTF-8として読めなかったCSVファイルのエンコーディングを推定します。
+
+    先頭4KBがASCIIのみで ``_detect_encoding`` が判定できなかった場合に備え、
+    最初にUTF-8として解釈できなかった箇所を含むブロックから推定します。
+
+    Args:
+        file_path: データファイルのパス。
+
+    Returns:
+        推定したエンコーディング。推定できない場合は ``"shift-jis"``。
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            try:
+                decoder.decode(block)
+            except UnicodeDecodeError:
+                break
+        else:
+            return "shift-jis"
+
+    return _guess_encoding(block)
+
+
+def _object_columns_of(df: pd.DataFrame, types: Tuple[type, ...]) -> List[int]:
+    """最初の欠損していない値が指定した型であるobject列の位置を返します。
+
+    Args:
+        df: 判定するデータフレーム。
+        types: 判定する型。
+
+    Returns:
+        該当する列の位置のリスト。
+    """
+    positions = []
+    for i, dtype in enumerate(df.dtypes):
+        if not pd.api.types.is_object_dtype(dtype):
+            continue
+        column = df.iloc[:, i]
+        index = column.first_valid_index()
+        if index is not None and isinstance(column.loc[index], types):
+            positions.append(i)
+    return positions
+
+
+def _has_bytes_columns(df: pd.DataFrame) -> bool:
+    """バイト列（bytes型）の値を持つ列があるかを判定します。
+
+    pyarrowエンジンは指定したエンコーディングで解釈できない列をエラーにせず、
+    バイナリ列として読み込むため、その検出に使います。
+
+    Args:
+        df: 判定するデータフレーム。
+
+    Returns:
+        object列の最初の欠損していない値がbytes型である列がある場合はTrue。
+    """
+    return len(_object_columns_of(df, (bytes,))) > 0
+
+
+def _temporal_columns(df: pd.DataFrame, dtypes: Optional[Dict[str, str]] = None) -> List[int]:
+    """pyarrowエンジンが日付・時刻として解釈した列の位置を返します。
+
+    pyarrowエンジンはISO 8601形式の列をdatetime64型や ``datetime.date`` の列として読み込みますが、
+    標準のエンジンは文字列のまま読み込みます。データ型を指定した列は対象外です。
+
+    Args:
+        df: pyarrowエンジンで読み込んだデータフレーム。
+        dtypes: 読み込み時に指定した列のデータ型。
+
+    Returns:
+        日付・時刻の列の位置のリスト。
+    """
+    specified = set(dtypes) if dtypes else set()
+    positions = [i for i, dtype in enumerate(df.dtypes) if pd.api.types.is_datetime64_any_dtype(dtype)]
+    # datetime.datetimeはdatetime.dateのサブクラス
+    positions += _object_columns_of(df, (datetime.date, datetime.time))
+    return sorted(i for i in positions if df.columns[i] not in specified)
+
+
+def _read_csv(file_path: str, encoding: Optional[str], dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """CSVファイルを指定したエンコーディングで読み込みます。
+
+    pyarrowが利用可能な場合はpyarrowエンジンで読み込み、失敗した場合や
+    エンコーディングを解釈できずバイナリ列になった場合は標準のエンジンで読み込みます。
+    読み込み方法によってデータ型が変わらないよう、pyarrowエンジンが日付・時刻として解釈した列は、
+    その列だけを標準のエンジンで読み直して文字列に戻します。
+
+    Args:
+        file_path: データファイルのパス。
+        encoding: エンコーディング。NoneはUTF-8。
+        dtypes: 列名からデータ型への対応。Noneの場合は自動で推定します。
+
+    Returns:
+        読み込んだデータフレーム。
+
+    Raises:
+        UnicodeDecodeError: 指定したエンコーディングで読み込めない場合。
+    """
+    try:
+        # pyarrowエンジンはマルチスレッドで解析する
+        df = pd.read_csv(file_path, engine="pyarrow", encoding=encoding, dtype=dtypes)
+    except ImportError:
+        # pyarrowがインストールされていない
+        pass
+    except Exception as e:
+        print(f"pyarrowエンジンでの読み込みに失敗しました: {e}")
+        print("標準のエンジンで再試行します...")
+    else:
+        if not _has_bytes_columns(df):
+            temporal = _temporal_columns(df, dtypes)
+            if temporal:
+                strings = pd.read_csv(file_path, encoding=encoding, usecols=temporal)
+                for k, i in enumerate(temporal):
+                    df.isetitem(i, strings.iloc[:, k])
+            return df
+        # 標準のエンジンはUnicodeDecodeErrorを送出するため、呼び出し元でエンコーディングを推定し直せる
+        print("pyarrowエンジンで文字列として解釈できない列があるため、標準のエンジンで再試行します...")
+    return pd.read_csv(file_path, encoding=encoding, dtype=dtypes)
+
+
+def _is_json_records(file_path: str) -> bool:
+    """JSONファイルがレコード（オブジェクト）の配列かどうかを先頭から判定します。
+
+    Args:
+        file_path: データファイルのパス。
+
+    Returns:
+        ``[{...}, ...]`` の形式（空の配列を含む）の場合はTrue。
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(4096).decode("utf-8", errors="ignore").lstrip("\ufeff \t\r\n")
+
+    if not head.startswith("["):
+        return False
+    return head[1:].lstrip(" \t\r\n")[:1] in ("{", "]")
+
+
+def _load_with_polars(file_path: str, file_ext: str) -> Optional[pd.DataFrame]:
+    """Polarsを使ってデータファイルを読み込みます。
+
+    Args:
+        file_path: データファイルのパス。
+        file_ext: ファイルの拡張子（小文字）。
+
+    Returns:
+        読み込んだデータフレーム。Polarsで扱えない形式の場合はNone。
+    """
+    pl = import_optional("polars")
+
+    if file_ext == ".csv":
+        # PolarsはUTF-8のみ対応しているため、それ以外はpandasで読み込む
+        if _detect_encoding(file_path) is not None:
+            return None
+        # pandasと同じデータ型になるよう、日付の列は文字列のまま読み込む
+        return pl.scan_csv(file_path, ignore_errors=True).collect().to_pandas()
+
+    elif file_ext == ".parquet":
+        return pl.scan_parquet(file_path).collect().to_pandas()
+
+    elif file_ext == ".json":
+        # Polarsはレコードの配列のみ正しく読めるため、pandasの既定の形式（orient="columns"）
+        # などはpandasで読み込む
+        if not _is_json_records(file_path):
+            return None
+        return pl.read_json(file_path).to_pandas()
+
+    return None
+
+
+def _read_file(file_path: str, file_ext: str, dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """拡張子に応じてデータファイルを読み込みます。
+
+    環境変数 ``LLMDL_FAST_IO=1`` が設定されていてpolarsが利用可能な場合は、
+    Polarsでマルチスレッドに読み込んでからpandasのデータフレームに変換します。
+    CSVファイルは、pyarrowが利用可能な場合はpyarrowエンジンで読み込みます。
+    先頭4KBから推定したエンコーディングで読み込めない場合は、推定し直して再試行します。
+
+    Args:
+        file_path: データファイルのパス。
+        file_ext: ファイルの拡張子（小文字）。
+        dtypes: 列名からデータ型への対応。Noneの場合は自動で推定します。
+
+    Returns:
+        読み込んだデータフレーム。
+
+    Raises:
+        ValueError: サポートされていないファイル形式の場合。
+    """
+    if _use_fast_io():
+        try:
+            df = _load_with_polars(file_path, file_ext)
+        except Exception as e:
+            print(f"Polarsでの読み込みに失敗しました: {e}")
+            print("pandasで再試行します...")
+        else:
+            if df is not None:
+                return df.astype(dtypes) if dtypes else df
+
+    if file_ext == ".csv":
+        # CSVファイルの読み込み
+        encoding = _detect_encoding(file_path)
+        if encoding is not None:
+            print(f"エンコーディングを {encoding} と推定して読み込みます...")
+        try:
+            return _read_csv(file_path, encoding, dtypes)
+        except UnicodeDecodeError as e:
+            # 先頭4KBより後ろにUTF-8以外の文字がある場合
+            fallback = _fallback_encoding(file_path)
+            if fallback == encoding:
+                raise
+            print(f"CSVファイルの読み込みに失敗しました: {e}")
+            print(f"エンコーディングを {fallback} として再試行します...")
+            return _read_csv(file_path, fallback, dtypes)
+
+    elif file_ext in [".xlsx", ".xls"]:
+        # Excelファイルの読み込み
+        return pd.read_excel(file_path, dtype=dtypes)
+
+    elif file_ext == ".json":
+        # JSONファイルの読み込み
+        return pd.read_json(file_path, dtype=dtypes)
+
+    elif file_ext == ".parquet":
+        # Parquetファイルの読み込み
+        df = pd.read_parquet(file_path)
+        return df.astype(dtypes) if dtypes else df
+
+    else:
+        raise ValueError(f"サポートされていないファイル形式です: {file_ext}")
+
+
+def _reader_name(file_ext: str) -> str:
+    """データファイルを読み込むリーダーの名前を返します。
+
+    同じファイルでもリーダーによって推定されるデータ型が異なるため、キャッシュのキーに含めます。
+
+    Args:
+        file_ext: ファイルの拡張子（小文字）。
+
+    Returns:
+        ``"polars"``・``"pandas-pyarrow"``・``"pandas"`` のいずれか。
+    """
+    if _use_fast_io() and file_ext in (".csv", ".parquet", ".json"):
+        return "polars"
+    if file_ext == ".csv" and pq is not None:
+        return "pandas-pyarrow"
+    return "pandas"
+
+
+def _cache_path(file_path: str, cache_dir: str, dtypes: Optional[Dict[str, str]] = None) -> str:
+    """キャッシュファイルのパスを返します。
+
+    ファイル名は ``<ファイル名>-<絶対パスのハッシュ>-<サイズと更新時刻のハッシュ>-<読み込み方法のハッシュ>.parquet``
+    です。元のファイルが更新されたり、読み込みに使うリーダーや指定したデータ型が変わったりすると
+    別のキャッシュになります。サイズと更新時刻を別のハッシュにしているため、
+    ``_save_cache`` で元のファイルが更新される前の古いキャッシュだけを削除できます。
+
+    Args:
+        file_path: データファイルのパス。
+        cache_dir: キャッシュディレクトリのパス。
+        dtypes: 読み込み時に指定した列のデータ型。
+
+    Returns:
+        キャッシュファイル（Parquet）のパス。
+    """
+    abspath = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    state = f"{stat.st_size}:{stat.st_mtime_ns}"
+    options = _reader_name(Path(file_path).suffix.lower())
+    if dtypes:
+        options += ":" + json.dumps(dtypes, sort_keys=True)
+
+    digests = [hashlib.sha256(key.encode("utf-8")).hexdigest()[:16] for key in (abspath, state, options)]
+    return os.path.join(cache_dir, "-".join([Path(file_path).stem] + digests) + ".parquet")
+
+
+def _save_cache(df: pd.DataFrame, cache_path: str) -> None:
+    """データフレームをzstd圧縮のParquetとしてキャッシュに保存します。
+
+    一時ファイルに書き込んでから置き換えるため、同じファイルを同時に読み込んでも
+    書きかけのキャッシュが読まれることはありません。
+    キャッシュが溜まり続けないよう、保存後に同じファイルの更新前のキャッシュを削除します。
+    リーダーやデータ型の指定だけが異なるキャッシュは、切り替えて使えるよう残します。
+    保存に失敗しても分析は続行できるため、例外は送出せずメッセージのみ表示します。
+
+    Args:
+        df: 保存するデータフレーム。
+        cache_path: キャッシュファイルのパス。
+    """
+    cache_dir = os.path.dirname(cache_path)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # 実行ごとに別の一時ファイルにして、同時に保存しても互いに上書きしないようにする
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd", compression_level=3)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"キャッシュの保存に失敗しました: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+
+    # ファイル名とパスのハッシュが同じで、サイズと更新時刻のハッシュが異なるものは更新前のキャッシュ
+    prefix, state_digest, _ = Path(cache_path).stem.rsplit("-", 2)
+    for cached in Path(cache_dir).glob(f"{glob.escape(prefix)}-*-*.parquet"):
+        cached_prefix, cached_state, _ = cached.stem.rsplit("-", 2)
+        if cached_prefix == prefix and cached_state != state_digest:
+            try:
+                cached.unlink()
+            except OSError:
+                pass
+
+
+def load_data(
+    file_path: str, cache_dir: Optional[str] = None, dtypes: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """データファイルを読み込みます。
+
+    ``cache_dir`` を指定すると、初回の読み込み結果をParquet形式でキャッシュし、
+    2回目以降はキャッシュから読み込みます。
+
+    Args:
+        file_path: データファイルのパス。
+        cache_dir: キャッシュディレクトリのパス。Noneの場合はキャッシュしない。
+        dtypes: 列名からデータ型への対応。Noneの場合は自動で推定します。
+
+    Returns:
+        読み込んだデータフレーム。
+
+    Raises:
+        FileNotFoundError: ファイルが見つからない場合。
+        ValueError: サポートされていないファイル形式の場合。
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
+
+    file_ext = Path(file_path).suffix.lower()
+
+    # Parquetファイルはそのまま読み込む方が速いためキャッシュしない
+    cache_path = None
+    if cache_dir is not None and file_ext != ".parquet":
+        cache_path = _cache_path(file_path, cache_dir, dtypes)
+        if os.path.exists(cache_path):
+            try:
+                df = pd.read_parquet(cache_path, engine="pyarrow")
+            except Exception as e:
+                print(f"キャッシュの読み込みに失敗しました: {e}")
+            else:
+                print(f"キャッシュから読み込みました: {cache_path}")
+                return df
+
+    df = _read_file(file_path, file_ext, dtypes)
+
+    if cache_path is not None:
+        _save_cache(df, cache_path)
+
+    return df
+
+
+def load_head(file_path: str, n: int, dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """データファイルの先頭n行のみを読み込みます。
+
+    CSVとExcelは先頭n行だけを解析し、Parquetは最初のバッチのみを読み込むため、
+    巨大なファイルでも全体を読み込まずに中身を確認できます。
+
+    Args:
+        file_path: データファイルのパス。
+        n: 読み込む行数。
+        dtypes: 列名からデータ型への対応。Noneの場合は自動で推定します。
+
+    Returns:
+        先頭n行のデータフレーム。
+
+    Raises:
+        FileNotFoundError: ファイルが見つからない場合。
+        ValueError: サポートされていないファイル形式の場合。
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
+
+    file_ext = Path(file_path).suffix.lower()
+
+    if file_ext == ".csv":
+        # pyarrowエンジンはnrowsに対応していないため標準のエンジンで読み込む
+        try:
+            return pd.read_csv(file_path, nrows=n, encoding=_detect_encoding(file_path), dtype=dtypes)
+        except UnicodeDecodeError:
+            return pd.read_csv(file_path, nrows=n, encoding=_fallback_encoding(file_path), dtype=dtypes)
+
+    elif file_ext in [".xlsx", ".xls"]:
+        return pd.read_excel(file_path, nrows=n, dtype=dtypes)
+
+    elif file_ext == ".json":
+        # JSON配列は途中で打ち切って解析できないため、全体を読み込む
+        return pd.read_json(file_path, dtype=dtypes).head(n)
+
+    elif file_ext == ".parquet":
+        if pq is not None:
+            batch = next(pq.ParquetFile(file_path).iter_batches(batch_size=max(n, 1)), None)
+            if batch is not None:
+                df = batch.to_pandas().head(n)
+                return df.astype(dtypes) if dtypes else df
+        df = pd.read_parquet(file_path).head(n)
+        return df.astype(dtypes) if dtypes else df
+
+    else:
+        raise ValueError(f"サポートされていないファイル形式です: {file_ext}")
+
+
+def downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """数値列をより小さいデータ型に変換します。
+
+    浮動小数点列はfloat32に、整数列は値が収まる最小の整数型に変換します。
+    object列や日付列などはそのまま残します。
+
+    Args:
+        df: 変換するデータフレーム。列はその場で置き換えられます。
+
+    Returns:
+        変換後のデータフレーム。
+    """
+    for i, dtype in enumerate(df.dtypes):
+        if pd.api.types.is_float_dtype(dtype):
+            kind = "float"
+        elif pd.api.types.is_integer_dtype(dtype):
+            kind = "integer"
+        else:
+            continue
+        # 列名が重複していても置き換えられるよう、位置で指定する
+        df.isetitem(i, pd.to_numeric(df.iloc[:, i], downcast=kind))
+
+    return df
+
+
+def fast_corr(numeric_df: pd.DataFrame) -> pd.DataFrame:
+    """数値列の相関係数行列をBLASの行列積で計算します。
+
+    平均と標準偏差はfloat64で計算して標準化し、標準化した行列をfloat32に変換してから
+    行列の積1回で相関行列を求めます。標準化の前にfloat32に変換すると、
+    エポック秒のように値の大きな列の精度が失われるためです。
+    scipyが利用可能な場合は ``ssyrk`` で上三角のみを計算します。
+    欠損値を含む場合は、ペアごとに欠損を除外する ``DataFrame.corr`` と
+    結果を一致させるため、pandasで計算します。
+
+    Args:
+        numeric_df: 数値列のみからなるデータフレーム。
+
+    Returns:
+        相関係数行列。
+    """
+    x = numeric_df.to_numpy(dtype=np.float64, copy=False, na_value=np.nan)
+    n = x.shape[0]
+    if n < 2 or np.isnan(x).any():
+        return numeric_df.corr()
+
+    std = x.std(axis=0)
+    # 定数列は相関係数を定義できないため、pandasと同様にNaNとする
+    std[std == 0] = np.nan
+    xn = x - x.mean(axis=0)
+    xn /= std
+    xn = xn.astype(np.float32, order="C")
+
+    scipy_blas = import_optional("scipy.linalg.blas")
+    if scipy_blas is not None:
+        # xn.TはFortran順序になるため、コピーせずにBLASへ渡せる
+        upper = scipy_blas.ssyrk(alpha=1.0 / n, a=xn.T)
+        corr = np.triu(upper) + np.triu(upper, k=1).T
+    else:
+        corr = (xn.T @ xn) / n
+
+    np.clip(corr, -1.0, 1.0, out=corr)
+    np.fill_diagonal(corr, np.where(np.isnan(std), np.nan, 1.0))
+
+    return pd.DataFrame(corr, index=numeric_df.columns, columns=numeric_df.columns)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Numbaでコンパイルする計算カーネルをまとめたモジュール。
+
+numbaのインポートとJITコンパイルには時間がかかるため、各スクリプトは
+カーネルが必要になった時点でのみ ``import_optional("_numba_kernels")`` でインポートします。
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def threshold_pairs(corr: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """相関行列の下三角から閾値以上のペアを抽出するNumbaカーネル。
+
+    1回目の走査で行ごとの該当数を数え、その累積和を書き込み位置として
+    2回目の走査で結果を埋めるため、下三角全体のマスクを確保しません。
+
+    Args:
+        corr: 相関行列。
+        threshold: 相関係数の閾値。
+
+    Returns:
+        行番号・列番号・相関係数の配列のタプル。行優先の順に並びます。
+    """
+    m = corr.shape[0]
+    counts = np.zeros(m, dtype=np.int64)
+    for i in prange(m):
+        c = 0
+        for j in range(i):
+            if abs(corr[i, j]) >= threshold:
+                c += 1
+        counts[i] = c
+
+    offsets = np.zeros(m + 1, dtype=np.int64)
+    for i in range(m):
+        offsets[i + 1] = offsets[i] + counts[i]
+
+    total = offsets[m]
+    i_arr = np.empty(total, dtype=np.int64)
+    j_arr = np.empty(total, dtype=np.int64)
+    v_arr = np.empty(total, dtype=corr.dtype)
+    for i in prange(m):
+        k = offsets[i]
+        for j in range(i):
+            v = corr[i, j]
+            if abs(v) >= threshold:
+                i_arr[k] = i
+                j_arr[k] = j
+                v_arr[k] = v
+                k += 1
+
+    return i_arr, j_arr, v_arr
@@ -8,135 +8,333 @@
 """
 
 import argparse
-import os
-from pathlib import Path
-from typing import Optional, Union
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
 
-def load_data(file_path: str) -> pd.DataFrame:
-    """データファイルを読み込みます。
+from _common import DEFAULT_CACHE_DIR, downcast, fast_corr, import_optional, load_data, load_head
+
+# 分析レポートの集計を並列に実行するスレッド数
+REPORT_WORKERS = 4
+
+# 分析レポートで計算する集計の種類
+REPORT_SECTIONS = ("statistics", "duplicates", "correlations")
+
+# 相関ペアの抽出にNumbaを使う列数の下限
+# 初回はJITコンパイルに約2秒かかり、NumPyのマスクがそれより遅くなるのは1万列程度から
+NUMBA_MIN_COLUMNS = 10_000
+
+
+def _find_high_corr_pairs(corr_matrix: pd.DataFrame, threshold: float) -> List[Tuple[str, str, float]]:
+    """相関係数の絶対値が閾値以上となる列のペアを抽出します。
+
+    相関行列の下三角をNumPyのブールマスクで一括判定するため、
+    列数が多い場合でもPythonレベルのループを回しません。
+    列数が ``NUMBA_MIN_COLUMNS`` 以上でnumbaが利用可能な場合は、
+    マスクを確保しないNumbaの並列カーネルで抽出します。
+
+    Args:
+        corr_matrix: 相関行列。
+        threshold: 相関係数の閾値。
+
+    Returns:
+        (列名1, 列名2, 相関係数) のタプルのリスト。行優先の順に並びます。
+    """
+    arr = corr_matrix.to_numpy()
+    columns = corr_matrix.columns
+
+    if arr.shape[0] >= NUMBA_MIN_COLUMNS:
+        kernels = import_optional("_numba_kernels")
+        if kernels is not None:
+            i, j, values = kernels.threshold_pairs(np.ascontiguousarray(arr), threshold)
+            return list(zip(columns[i], columns[j], values))
+
+    i, j = np.tril_indices(arr.shape[0], k=-1)
+    values = arr[i, j]
+    # NaNは比較結果がFalseになるため除外される
+    mask = np.abs(values) >= threshold
+    return list(zip(columns[i[mask]], columns[j[mask]], values[mask]))
+
+
+def _to_arrow_table(df: pd.DataFrame) -> Optional["pa.Table"]:
+    """データフレームをArrowテーブルに変換します。
 
     Args:
-        file_path: データファイルのパス。
+        df: 変換するデータフレーム。
 
     Returns:
-        読み込んだデータフレーム。
+        Arrowテーブル。pyarrowが利用できない場合や変換できない場合はNone。
+    """
+    if pa is None or df.shape[1] == 0:
+        return None
 
-    Raises:
-        FileNotFoundError: ファイルが見つからない場合。
-        ValueError: サポートされていないファイル形式の場合。
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        # 型が混在したobject列などは変換できない
+        return None
+
+    # 列名を文字列に変換した結果が重複すると列を一意に指定できない
+    if len(set(table.column_names)) != table.num_columns:
+        return None
+
+    return table
+
+
+def _count_nulls(df: pd.DataFrame, table: Optional["pa.Table"]) -> pd.Series:
+    """各列の欠損値の数を数えます。
+
+    Arrowテーブルがある場合は、変換時に計算済みの ``null_count`` を使うため、
+    真偽値のデータフレームを作らずに済みます。
+
+    Args:
+        df: 分析対象のデータフレーム。
+        table: ``df`` を変換したArrowテーブル。Noneの場合はpandasで数えます。
+
+    Returns:
+        列名をインデックスとする欠損値の数。
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
+    if table is None:
+        return df.isnull().sum()
+    return pd.Series([column.null_count for column in table.columns], index=df.columns, dtype="int64")
+
 
-    file_ext = Path(file_path).suffix.lower()
+def _has_mixed_nulls(df: pd.DataFrame, table: "pa.Table") -> bool:
+    """object列の欠損値に種類の異なるものが混在しているかを判定します。
+
+    Arrowでは ``None`` も ``NaN`` もnullになりますが、``DataFrame.duplicated`` は
+    両者を別の値として扱うため、混在している場合はArrowで重複を数えられません。
+
+    Args:
+        df: 分析対象のデータフレーム。
+        table: ``df`` を変換したArrowテーブル。
 
-    if file_ext == ".csv":
-        # CSVファイルの読み込み
+    Returns:
+        ``None``・``NaN``・``pd.NA``・``pd.NaT`` のうち2種類以上を含むobject列がある場合はTrue。
+    """
+    for i, dtype in enumerate(df.dtypes):
+        if not pd.api.types.is_object_dtype(dtype) or table.column(i).null_count < 2:
+            continue
+        values = df.iloc[:, i].to_numpy()
+        kinds = {v if v is None or v is pd.NA or v is pd.NaT else type(v) for v in values[pd.isna(values)]}
+        if len(kinds) > 1:
+            return True
+    return False
+
+
+def _count_duplicates(df: pd.DataFrame, table: Optional["pa.Table"]) -> int:
+    """重複行の数を数えます。
+
+    Arrowテーブルがある場合は、全列をキーにしたグループ数（一意な行の数）を
+    行数から引いて求めます。``DataFrame.duplicated`` と結果を揃えるため、
+    浮動小数点列の ``-0.0`` は ``0.0`` にそろえ、object列に種類の異なる欠損値が
+    混在している場合はpandasで数えます。
+
+    Args:
+        df: 分析対象のデータフレーム。
+        table: ``df`` を変換したArrowテーブル。Noneの場合はpandasで数えます。
+
+    Returns:
+        重複行の数。
+    """
+    if table is not None and table.num_rows > 0 and not _has_mixed_nulls(df, table):
         try:
-            return pd.read_csv(file_path)
-        except Exception as e:
-            print(f"CSVファイルの読み込みに失敗しました: {e}")
-            print("エンコーディングを指定して再試行します...")
-            return pd.read_csv(file_path, encoding="shift-jis")
+            # 0を足すと-0.0が0.0になり、pandasと同様に同じ値としてグループ化される
+            columns = [
+                pc.add(column, pa.scalar(0, column.type)) if pa.types.is_floating(column.type) else column
+                for column in table.columns
+            ]
+            keys = pa.table(columns, names=table.column_names)
+            n_unique = keys.group_by(keys.column_names).aggregate([]).num_rows
+        except pa.ArrowException:
+            # リスト型など、グループ化のキーにできない列がある
+            pass
+        else:
+            return len(df) - n_unique
+
+    return int(df.duplicated().sum())
 
-    elif file_ext in [".xlsx", ".xls"]:
-        # Excelファイルの読み込み
-        return pd.read_excel(file_path)
 
-    elif file_ext == ".json":
-        # JSONファイルの読み込み
-        return pd.read_json(file_path)
+def _split_dtypes(dtypes: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """列のデータ型から数値列とカテゴリ列を判定します。
 
-    elif file_ext == ".parquet":
-        # Parquetファイルの読み込み
-        return pd.read_parquet(file_path)
+    ``select_dtypes(include=["number"])`` と ``select_dtypes(include=["object", "category"])``
+    を1回の走査で求めます。``select_dtypes`` と同様に、timedelta型の列は数値列に含め、
+    真偽値型の列は数値列に含めません。
 
-    else:
-        raise ValueError(f"サポートされていないファイル形式です: {file_ext}")
+    Args:
+        dtypes: ``DataFrame.dtypes`` の結果。
+
+    Returns:
+        数値列とカテゴリ列のそれぞれを表す真偽値の配列。
+    """
+    numeric_mask = np.zeros(len(dtypes), dtype=bool)
+    categorical_mask = np.zeros(len(dtypes), dtype=bool)
+    for i, dtype in enumerate(dtypes):
+        if pd.api.types.is_timedelta64_dtype(dtype) or (
+            pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        ):
+            numeric_mask[i] = True
+        elif pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+            categorical_mask[i] = True
+    return numeric_mask, categorical_mask
 
 
-def basic_statistics(df: pd.DataFrame) -> None:
+def _compute_report(df: pd.DataFrame, sections: Sequence[str] = REPORT_SECTIONS) -> Dict[str, Any]:
+    """分析レポートに必要な集計をまとめて計算します。
+
+    ``basic_statistics`` などの表示関数とレポートの保存で同じ集計を
+    繰り返さないよう、結果を辞書にまとめて使い回します。
+
+    Args:
+        df: 分析対象のデータフレーム。
+        sections: 計算する集計の種類。``"statistics"``・``"duplicates"``・
+            ``"correlations"`` から選びます。デフォルトはすべて。
+
+    Returns:
+        以下のキーを持つ辞書。``dtypes``・``numeric_cols``・``categorical_cols`` 以外は、
+        対応する ``sections`` を指定した場合のみ含まれます。
+
+        - dtypes: 各列のデータ型。
+        - nulls: 各列の欠損値の数（statistics）。
+        - describe_num: 数値列の基本統計量（statistics）。
+        - describe_cat: カテゴリ列の基本統計量。カテゴリ列がない場合はNone（statistics）。
+        - dup_count: 重複行の数（duplicates）。
+        - dup_sample: 重複行の例（先頭5行）（duplicates）。
+        - corr: 数値列の相関係数行列。数値列が2つ未満の場合はNone（correlations）。
+        - numeric_cols: 数値列の列名。
+        - categorical_cols: カテゴリ列（object型・category型）の列名。
+    """
+    # 列のデータ型を一度だけ走査して数値列とカテゴリ列を判定する
+    dtypes = df.dtypes
+    numeric_mask, categorical_mask = _split_dtypes(dtypes)
+    numeric_cols = df.columns[numeric_mask]
+    categorical_cols = df.columns[categorical_mask]
+
+    # 各タスクが列の選択で競合しないよう、投入前に部分データフレームを作っておく
+    numeric_df = df.iloc[:, numeric_mask]
+    categorical_df = df.iloc[:, categorical_mask]
+
+    # 欠損値と重複行はArrowテーブル上で数える
+    table = _to_arrow_table(df) if "statistics" in sections or "duplicates" in sections else None
+
+    # 各集計は独立しており、NumPy/pandasの内部処理中はGILが解放されるため並列に実行する
+    tasks = {}
+    with ThreadPoolExecutor(max_workers=REPORT_WORKERS) as executor:
+        if "statistics" in sections:
+            tasks["nulls"] = executor.submit(_count_nulls, df, table)
+            tasks["describe_num"] = executor.submit(df.describe)
+            tasks["describe_cat"] = executor.submit(categorical_df.describe) if len(categorical_cols) > 0 else None
+        if "duplicates" in sections:
+            tasks["dup_count"] = executor.submit(_count_duplicates, df, table)
+        if "correlations" in sections:
+            tasks["corr"] = executor.submit(fast_corr, numeric_df) if len(numeric_cols) >= 2 else None
+
+    report = {"dtypes": dtypes, "numeric_cols": numeric_cols, "categorical_cols": categorical_cols}
+    report.update({key: task.result() if task is not None else None for key, task in tasks.items()})
+
+    if "duplicates" in sections:
+        # 重複行の例は重複がある場合のみ抽出する
+        report["dup_sample"] = df[df.duplicated()].head() if report["dup_count"] > 0 else df.iloc[:0]
+
+    return report
+
+
+def basic_statistics(df: pd.DataFrame, report: Optional[Dict[str, Any]] = None) -> None:
     """データフレームの基本的な統計情報を表示します。
 
     Args:
         df: 分析対象のデータフレーム。
+        report: ``_compute_report`` の計算結果。Noneの場合は表示に必要な集計のみ計算します。
     """
+    if report is None:
+        report = _compute_report(df, sections=("statistics",))
+
     print("\n=== 基本情報 ===")
     print(f"行数: {df.shape[0]}")
     print(f"列数: {df.shape[1]}")
 
     print("\n=== データ型 ===")
-    print(df.dtypes)
+    print(report["dtypes"])
 
     print("\n=== 欠損値の数 ===")
-    print(df.isnull().sum())
+    print(report["nulls"])
 
     print("\n=== 数値列の基本統計量 ===")
-    print(df.describe())
+    print(report["describe_num"])
 
     # カテゴリ列の基本統計量
-    categorical_cols = df.select_dtypes(include=["object", "category"]).columns
-    if len(categorical_cols) > 0:
+    if report["describe_cat"] is not None:
         print("\n=== カテゴリ列の基本統計量 ===")
-        print(df[categorical_cols].describe())
+        print(report["describe_cat"])
 
 
-def check_duplicates(df: pd.DataFrame) -> None:
+def check_duplicates(df: pd.DataFrame, report: Optional[Dict[str, Any]] = None) -> None:
     """データフレームの重複行を確認します。
 
     Args:
         df: 分析対象のデータフレーム。
+        report: ``_compute_report`` の計算結果。Noneの場合は表示に必要な集計のみ計算します。
     """
-    dup_count = df.duplicated().sum()
+    if report is None:
+        report = _compute_report(df, sections=("duplicates",))
+
+    dup_count = report["dup_count"]
     print(f"\n=== 重複行の数: {dup_count} ===")
     if dup_count > 0:
         print("重複行の例:")
-        print(df[df.duplicated(keep="first")].head())
+        print(report["dup_sample"])
 
 
-def analyze_correlations(df: pd.DataFrame, threshold: float = 0.7) -> None:
+def analyze_correlations(df: pd.DataFrame, threshold: float = 0.7, report: Optional[Dict[str, Any]] = None) -> None:
     """数値列間の相関関係を分析します。
 
     Args:
         df: 分析対象のデータフレーム。
         threshold: 表示する相関係数の閾値。
+        report: ``_compute_report`` の計算結果。Noneの場合は表示に必要な集計のみ計算します。
     """
-    # 数値列のみを選択
-    numeric_df = df.select_dtypes(include=["number"])
+    if report is None:
+        report = _compute_report(df, sections=("correlations",))
 
-    if numeric_df.shape[1] < 2:
+    corr_matrix = report["corr"]
+    if corr_matrix is None:
         print("\n=== 相関分析 ===")
         print("数値列が2つ未満のため、相関分析を行えません。")
         return
 
-    # 相関係数の計算
-    corr_matrix = numeric_df.corr()
-
     # 閾値以上の相関係数を持つ列のペアを表示
     print(f"\n=== 相関係数（絶対値が{threshold}以上のもの）===")
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i):
-            if abs(corr_matrix.iloc[i, j]) >= threshold:
-                col1 = corr_matrix.columns[i]
-                col2 = corr_matrix.columns[j]
-                corr_val = corr_matrix.iloc[i, j]
-                print(f"{col1} - {col2}: {corr_val:.4f}")
+    for col1, col2, corr_val in _find_high_corr_pairs(corr_matrix, threshold):
+        print(f"{col1} - {col2}: {corr_val:.4f}")
 
 
-def save_analysis_report(df: pd.DataFrame, output_path: Optional[str] = None) -> None:
+def save_analysis_report(
+    df: pd.DataFrame, output_path: Optional[str] = None, report: Optional[Dict[str, Any]] = None
+) -> None:
     """分析結果をファイルに保存します。
 
     Args:
         df: 分析対象のデータフレーム。
         output_path: 出力ファイルのパス。Noneの場合は保存しません。
+        report: ``_compute_report`` の計算結果。Noneの場合はここで計算します。
     """
     if output_path is None:
         return
 
+    if report is None:
+        report = _compute_report(df)
+
     with open(output_path, "w", encoding="utf-8") as f:
         # 基本情報
         f.write("=== 基本情報 ===\n")
@@ -145,38 +343,30 @@ def save_analysis_report(df: pd.DataFrame, output_path: Optional[str] = None) ->
 
         # データ型
         f.write("=== データ型 ===\n")
-        f.write(str(df.dtypes) + "\n\n")
+        f.write(str(report["dtypes"]) + "\n\n")
 
         # 欠損値
         f.write("=== 欠損値の数 ===\n")
-        f.write(str(df.isnull().sum()) + "\n\n")
+        f.write(str(report["nulls"]) + "\n\n")
 
         # 基本統計量
         f.write("=== 数値列の基本統計量 ===\n")
-        f.write(str(df.describe()) + "\n\n")
+        f.write(str(report["describe_num"]) + "\n\n")
 
         # カテゴリ列の基本統計量
-        categorical_cols = df.select_dtypes(include=["object", "category"]).columns
-        if len(categorical_cols) > 0:
+        if report["describe_cat"] is not None:
             f.write("=== カテゴリ列の基本統計量 ===\n")
-            f.write(str(df[categorical_cols].describe()) + "\n\n")
+            f.write(str(report["describe_cat"]) + "\n\n")
 
         # 重複行
-        dup_count = df.duplicated().sum()
-        f.write(f"=== 重複行の数: {dup_count} ===\n\n")
+        f.write(f"=== 重複行の数: {report['dup_count']} ===\n\n")
 
         # 相関分析
-        numeric_df = df.select_dtypes(include=["number"])
-        if numeric_df.shape[1] >= 2:
+        corr_matrix = report["corr"]
+        if corr_matrix is not None:
             f.write("=== 相関係数（絶対値が0.7以上のもの）===\n")
-            corr_matrix = numeric_df.corr()
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i):
-                    if abs(corr_matrix.iloc[i, j]) >= 0.7:
-                        col1 = corr_matrix.columns[i]
-                        col2 = corr_matrix.columns[j]
-                        corr_val = corr_matrix.iloc[i, j]
-                        f.write(f"{col1} - {col2}: {corr_val:.4f}\n")
+            for col1, col2, corr_val in _find_high_corr_pairs(corr_matrix, 0.7):
+                f.write(f"{col1} - {col2}: {corr_val:.4f}\n")
 
     print(f"分析レポートを保存しました: {output_path}")
 
@@ -185,31 +375,59 @@ def main() -> None:
     """メイン関数。"""
     parser = argparse.ArgumentParser(description="データファイルの基本的な分析を行います。")
     parser.add_argument("file_path", help="分析するデータファイルのパス")
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR, help=f"読み込んだデータのキャッシュ先（デフォルト: {DEFAULT_CACHE_DIR}）"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="キャッシュを使用しない")
+    parser.add_argument("--dtypes", metavar="PATH", help="列名とデータ型の対応を記述したJSONファイルのパス")
+    parser.add_argument("--no-downcast", action="store_true", help="数値列をfloat32などに縮小せず元の精度で扱う")
     parser.add_argument("--output", "-o", help="分析結果を保存するファイルのパス")
     parser.add_argument("--head", "-n", type=int, default=5, help="表示する先頭行数")
+    parser.add_argument(
+        "--head-only", action="store_true", help="先頭行のみを読み込んで表示する（--output指定時は無視）"
+    )
 
     args = parser.parse_args()
 
     try:
         # データの読み込み
-        df = load_data(args.file_path)
+        dtypes = None
+        if args.dtypes:
+            with open(args.dtypes, encoding="utf-8") as f:
+                dtypes = json.load(f)
+
+        # 先頭行の確認だけなら、ファイル全体を読み込まない
+        if args.head_only and not args.output:
+            print(f"\n=== データの先頭 {args.head} 行 ===")
+            print(load_head(args.file_path, args.head, dtypes=dtypes))
+            return
+
+        cache_dir = None if args.no_cache else args.cache_dir
+        df = load_data(args.file_path, cache_dir=cache_dir, dtypes=dtypes)
+
+        # 数値列のデータ型を縮小してメモリ帯域を節約
+        if not args.no_downcast:
+            df = downcast(df)
 
         # データの先頭を表示
         print(f"\n=== データの先頭 {args.head} 行 ===")
         print(df.head(args.head))
 
+        # 各セクションで使う集計を一度だけ計算
+        report = _compute_report(df)
+
         # 基本的な統計情報
-        basic_statistics(df)
+        basic_statistics(df, report=report)
 
         # 重複行の確認
-        check_duplicates(df)
+        check_duplicates(df, report=report)
 
         # 相関分析
-        analyze_correlations(df)
+        analyze_correlations(df, report=report)
 
         # 分析結果の保存
         if args.output:
-            save_analysis_report(df, args.output)
+            save_analysis_report(df, args.output, report=report)
 
     except Exception as e:
         print(f"エラーが発生しました: {e}")
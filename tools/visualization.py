@@ -8,80 +8,136 @@
 """
 
 import argparse
-import os
+import json
+from functools import lru_cache
 from pathlib import Path
+from types import ModuleType
 from typing import List, Optional, Tuple, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
 
+from _common import DEFAULT_CACHE_DIR, downcast, fast_corr, import_optional, load_data
 
-def load_data(file_path: str) -> pd.DataFrame:
-    """データファイルを読み込みます。
+# 散布図などで描画する最大の点数
+DEFAULT_MAX_POINTS = 50_000
+
+# 散布図を六角形ビンの密度表示に切り替える行数
+HEXBIN_THRESHOLD = 200_000
+
+# 時系列グラフで描画する最大の点数（超える場合はLTTB法で間引く）
+LTTB_POINTS = 2000
+
+# 時系列グラフでマーカーを描画する最大の点数
+MARKER_MAX_POINTS = 1000
+
+# 相関ヒートマップに数値を表示する最大の列数
+ANNOT_MAX_COLUMNS = 20
+
+# プロットスタイルを定義したmatplotlibスタイルシート
+PLOT_STYLE_FILE = Path(__file__).with_name("llm-data-lab.mplstyle")
+
+
+def _maybe_sample(df: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS) -> pd.DataFrame:
+    """行数が多い場合に描画用にランダムサンプリングします。
 
     Args:
-        file_path: データファイルのパス。
+        df: データフレーム。
+        max_points: 描画する最大の行数。0以下の場合はサンプリングしない。
 
     Returns:
-        読み込んだデータフレーム。
-
-    Raises:
-        FileNotFoundError: ファイルが見つからない場合。
-        ValueError: サポートされていないファイル形式の場合。
+        サンプリング後のデータフレーム。行数が ``max_points`` 以下の場合はそのまま。
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
+    if max_points <= 0 or len(df) <= max_points:
+        return df
 
-    file_ext = Path(file_path).suffix.lower()
+    print(f"データが{len(df)}行あるため、{max_points}行をランダムサンプリングして描画します。")
+    return df.sample(n=max_points, random_state=0)
 
-    if file_ext == ".csv":
-        # CSVファイルの読み込み
-        try:
-            return pd.read_csv(file_path)
-        except Exception as e:
-            print(f"CSVファイルの読み込みに失敗しました: {e}")
-            print("エンコーディングを指定して再試行します...")
-            return pd.read_csv(file_path, encoding="shift-jis")
 
-    elif file_ext in [".xlsx", ".xls"]:
-        # Excelファイルの読み込み
-        return pd.read_excel(file_path)
+@lru_cache(maxsize=1)
+def _import_seaborn() -> Optional[ModuleType]:
+    """seabornを必要になった時点でインポートします。
 
-    elif file_ext == ".json":
-        # JSONファイルの読み込み
-        return pd.read_json(file_path)
+    Returns:
+        seabornモジュール。インストールされていない場合はNone。
+    """
+    try:
+        import seaborn as sns
+    except ImportError:
+        print("seabornがインストールされていないため、matplotlibのみで描画します。")
+        return None
+    return sns
 
-    elif file_ext == ".parquet":
-        # Parquetファイルの読み込み
-        return pd.read_parquet(file_path)
 
-    else:
-        raise ValueError(f"サポートされていないファイル形式です: {file_ext}")
+@lru_cache(maxsize=1)
+def setup_plot_style() -> None:
+    """プロットのスタイルを設定します。
+
+    スクリプトと同じディレクトリにあるスタイルシート（PLOT_STYLE_FILE）を適用します。
+    seabornのスタイル設定を経由しないためseabornのインポートが不要で、
+    rcParamsの変更は1回で十分なため、2回目以降の呼び出しでは何もしません。
+    """
+    import matplotlib.pyplot as plt
 
+    plt.style.use(PLOT_STYLE_FILE)
 
-def setup_plot_style() -> None:
-    """プロットのスタイルを設定します。"""
-    # Seabornのスタイル設定
-    sns.set_style("whitegrid")
 
-    # フォントの設定
-    plt.rcParams["font.family"] = "sans-serif"
-    plt.rcParams["font.sans-serif"] = ["Hiragino Sans", "Yu Gothic", "Meiryo", "Arial", "DejaVu Sans"]
+def _kde_curve(values: np.ndarray, grid_size: int = 1024) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """カーネル密度推定の曲線を計算します。
 
-    # 日本語の文字化け防止
-    plt.rcParams["axes.unicode_minus"] = False
+    バンド幅はSilvermanの目安で決めます。KDEpyが利用可能な場合はFFTを使う ``FFTKDE`` で計算し、
+    利用できない場合は、細かいヒストグラムをガウス核で畳み込む近似（binned KDE）で計算します。
+    どちらも同じバンド幅を使うため、インストールされているパッケージによらず同じ曲線になります。
+    いずれもデータ数Nに対してO(N + M log M)で済みます（Mはグリッド点数）。
 
+    Args:
+        values: 欠損値を除いた1次元のデータ。
+        grid_size: 密度を評価するグリッドの点数。
 
-def plot_histogram(df: pd.DataFrame, column: str, bins: int = 30, output_path: Optional[str] = None) -> None:
+    Returns:
+        (グリッドの座標, 密度) のタプル。データが2点未満か定数の場合はNone。
+    """
+    if len(values) < 2 or np.ptp(values) == 0:
+        return None
+
+    # Silvermanの目安でバンド幅を決める（四分位範囲が0の場合は標準偏差のみを使う）
+    std = values.std(ddof=1)
+    iqr = np.subtract(*np.percentile(values, [75, 25]))
+    sigma = min(std, iqr / 1.349) if iqr > 0 else std
+    bw = 0.9 * sigma * len(values) ** (-0.2)
+
+    # KDEpyはscipyを読み込むため、密度曲線を描くときだけインポートする
+    kdepy = import_optional("KDEpy")
+    if kdepy is not None:
+        # KDEpyのbw="silverman"は四分位範囲が0だとバンド幅を1.0にしてしまうため、計算した値を渡す
+        return kdepy.FFTKDE(bw=bw).fit(values).evaluate(grid_size)
+
+    # 両端にカーネル幅の余白を取ったグリッド上で畳み込む
+    counts, edges = np.histogram(values, bins=grid_size, range=(values.min() - 3 * bw, values.max() + 3 * bw))
+    dx = edges[1] - edges[0]
+    half = int(np.ceil(3 * bw / dx))
+    kernel = np.exp(-0.5 * (np.arange(-half, half + 1) * dx / bw) ** 2)
+    kernel /= kernel.sum()
+    density = np.convolve(counts, kernel, mode="same") / (len(values) * dx)
+
+    return edges[:-1] + dx / 2, density
+
+
+def plot_histogram(
+    df: pd.DataFrame, column: str, bins: int = 30, output_path: Optional[str] = None, kde: bool = True
+) -> None:
     """指定した列のヒストグラムを描画します。
 
+    度数は ``np.histogram`` で集計し、密度曲線は ``_kde_curve`` で計算するため、
+    行数が多い場合でもseabornの ``histplot`` より高速に描画できます。
+
     Args:
         df: データフレーム。
         column: ヒストグラムを描画する列名。
         bins: ビンの数。
         output_path: 出力ファイルのパス。Noneの場合は表示のみ。
+        kde: 密度曲線を重ねて描画するかどうか。
     """
     if column not in df.columns:
         raise ValueError(f"列 '{column}' はデータフレームに存在しません。")
@@ -89,8 +145,23 @@ def plot_histogram(df: pd.DataFrame, column: str, bins: int = 30, output_path: O
     if not pd.api.types.is_numeric_dtype(df[column]):
         raise ValueError(f"列 '{column}' は数値型ではありません。")
 
+    import matplotlib.pyplot as plt
+
+    values = df[column].to_numpy(dtype=float, na_value=np.nan)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    widths = np.diff(edges)
+
     plt.figure(figsize=(10, 6))
-    sns.histplot(data=df, x=column, bins=bins, kde=True)
+    plt.bar(edges[:-1], counts, width=widths, align="edge", edgecolor="white", alpha=0.75)
+
+    if kde:
+        curve = _kde_curve(values)
+        if curve is not None:
+            # 密度をヒストグラムの度数のスケールに合わせる
+            grid, density = curve
+            plt.plot(grid, density * counts.sum() * widths.mean())
+
     plt.title(f"{column} の分布")
     plt.xlabel(column)
     plt.ylabel("頻度")
@@ -123,13 +194,28 @@ def plot_boxplot(df: pd.DataFrame, column: str, by: Optional[str] = None, output
     if by is not None and by not in df.columns:
         raise ValueError(f"列 '{by}' はデータフレームに存在しません。")
 
+    import matplotlib.pyplot as plt
+
+    sns = _import_seaborn()
+
     plt.figure(figsize=(12, 6))
 
     if by is None:
-        sns.boxplot(x=df[column])
+        if sns is not None:
+            sns.boxplot(x=df[column])
+        else:
+            plt.boxplot(df[column].dropna(), vert=False)
+            plt.xlabel(column)
         plt.title(f"{column} の箱ひげ図")
     else:
-        sns.boxplot(x=by, y=column, data=df)
+        if sns is not None:
+            sns.boxplot(x=by, y=column, data=df)
+        else:
+            groups = [(name, group[column].dropna()) for name, group in df.groupby(by)]
+            plt.boxplot([values for _, values in groups])
+            plt.xticks(range(1, len(groups) + 1), [str(name) for name, _ in groups])
+            plt.xlabel(by)
+            plt.ylabel(column)
         plt.title(f"{by} ごとの {column} の箱ひげ図")
 
     plt.tight_layout()
@@ -143,15 +229,27 @@ def plot_boxplot(df: pd.DataFrame, column: str, by: Optional[str] = None, output
     plt.close()
 
 
-def plot_scatter(df: pd.DataFrame, x: str, y: str, hue: Optional[str] = None, output_path: Optional[str] = None) -> None:
+def plot_scatter(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    hue: Optional[str] = None,
+    output_path: Optional[str] = None,
+    max_points: int = DEFAULT_MAX_POINTS,
+) -> None:
     """散布図を描画します。
 
+    行数が ``max_points`` を超える場合はサンプリングして描画します。
+    色分けせず、行数が ``HEXBIN_THRESHOLD`` を超える場合は、
+    全データを六角形ビンで集計した密度図を描画します。
+
     Args:
         df: データフレーム。
         x: X軸の列名。
         y: Y軸の列名。
         hue: 色分けする列名。Noneの場合は色分けしない。
         output_path: 出力ファイルのパス。Noneの場合は表示のみ。
+        max_points: 描画する最大の点数。0以下の場合はすべての点を描画する。
     """
     if x not in df.columns:
         raise ValueError(f"列 '{x}' はデータフレームに存在しません。")
@@ -168,12 +266,40 @@ def plot_scatter(df: pd.DataFrame, x: str, y: str, hue: Optional[str] = None, ou
     if hue is not None and hue not in df.columns:
         raise ValueError(f"列 '{hue}' はデータフレームに存在しません。")
 
+    # 描画する列だけを残し、サンプリングで他の列までコピーしないようにする
+    df = df[list(dict.fromkeys([x, y] + ([hue] if hue is not None else [])))]
+
+    # 点が多すぎる場合は密度図にするか、サンプリングする
+    use_hexbin = hue is None and max_points > 0 and len(df) > HEXBIN_THRESHOLD
+    if not use_hexbin:
+        df = _maybe_sample(df, max_points)
+
+    import matplotlib.pyplot as plt
+
+    sns = _import_seaborn()
+
     plt.figure(figsize=(10, 8))
 
-    if hue is None:
-        sns.scatterplot(x=x, y=y, data=df)
+    # PDF/SVGで保存する場合もデータ部分のみラスタ化し、軸や文字はベクターのまま残す
+    if use_hexbin:
+        print(f"データが{len(df)}行あるため、密度図（hexbin）で描画します。")
+        valid = df.dropna()
+        plt.hexbin(
+            valid[x].to_numpy(dtype=float), valid[y].to_numpy(dtype=float), gridsize=100, mincnt=1, rasterized=True
+        )
+        plt.colorbar(label="件数")
+    elif sns is not None:
+        if hue is None:
+            sns.scatterplot(x=x, y=y, data=df, rasterized=True)
+        else:
+            sns.scatterplot(x=x, y=y, hue=hue, data=df, rasterized=True)
     else:
-        sns.scatterplot(x=x, y=y, hue=hue, data=df)
+        if hue is None:
+            plt.scatter(df[x], df[y], rasterized=True)
+        else:
+            for name, group in df.groupby(hue):
+                plt.scatter(group[x], group[y], label=str(name), rasterized=True)
+            plt.legend(title=hue)
 
     plt.title(f"{x} と {y} の散布図")
     plt.xlabel(x)
@@ -192,6 +318,8 @@ def plot_scatter(df: pd.DataFrame, x: str, y: str, hue: Optional[str] = None, ou
 def plot_correlation_heatmap(df: pd.DataFrame, output_path: Optional[str] = None) -> None:
     """相関係数のヒートマップを描画します。
 
+    列数が ``ANNOT_MAX_COLUMNS`` を超える場合は、セル内の数値を表示しません。
+
     Args:
         df: データフレーム。
         output_path: 出力ファイルのパス。Noneの場合は表示のみ。
@@ -204,16 +332,45 @@ def plot_correlation_heatmap(df: pd.DataFrame, output_path: Optional[str] = None
         return
 
     # 相関係数の計算
-    corr_matrix = numeric_df.corr()
+    corr_matrix = fast_corr(numeric_df)
 
     # ヒートマップの描画
+    import matplotlib.pyplot as plt
+
+    sns = _import_seaborn()
+
     plt.figure(figsize=(12, 10))
     mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-    cmap = sns.diverging_palette(230, 20, as_cmap=True)
 
-    sns.heatmap(
-        corr_matrix, mask=mask, cmap=cmap, vmax=1, vmin=-1, center=0, annot=True, fmt=".2f", square=True, linewidths=0.5
-    )
+    # 列数が多いと数値が読めず描画も遅くなるため、少ない場合のみ表示する
+    annot = corr_matrix.shape[0] <= ANNOT_MAX_COLUMNS
+    # 表示用の文字列はまとめて整形しておく
+    labels = np.char.mod("%.2f", corr_matrix.to_numpy()) if annot else None
+
+    if sns is not None:
+        cmap = sns.diverging_palette(230, 20, as_cmap=True)
+        sns.heatmap(
+            corr_matrix,
+            mask=mask,
+            cmap=cmap,
+            vmax=1,
+            vmin=-1,
+            center=0,
+            annot=labels if annot else False,
+            fmt="",
+            square=True,
+            linewidths=0.5,
+        )
+    else:
+        plt.imshow(np.ma.masked_where(mask, corr_matrix.to_numpy()), cmap="coolwarm", vmin=-1, vmax=1)
+        plt.colorbar()
+        plt.grid(False)
+        ticks = np.arange(len(corr_matrix.columns))
+        plt.xticks(ticks, corr_matrix.columns, rotation=90)
+        plt.yticks(ticks, corr_matrix.columns)
+        if annot:
+            for i, j in zip(*np.nonzero(~mask)):
+                plt.text(j, i, labels[i, j], ha="center", va="center")
 
     plt.title("相関係数ヒートマップ")
     plt.tight_layout()
@@ -228,15 +385,22 @@ def plot_correlation_heatmap(df: pd.DataFrame, output_path: Optional[str] = None
 
 
 def plot_pairplot(
-    df: pd.DataFrame, columns: Optional[List[str]] = None, hue: Optional[str] = None, output_path: Optional[str] = None
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    hue: Optional[str] = None,
+    output_path: Optional[str] = None,
+    max_points: int = DEFAULT_MAX_POINTS,
 ) -> None:
     """ペアプロットを描画します。
 
+    行数が ``max_points`` を超える場合はサンプリングして描画します。
+
     Args:
         df: データフレーム。
         columns: 描画する列のリスト。Noneの場合は数値列すべて。
         hue: 色分けする列名。Noneの場合は色分けしない。
         output_path: 出力ファイルのパス。Noneの場合は表示のみ。
+        max_points: 描画する最大の点数。0以下の場合はすべての点を描画する。
     """
     # 描画する列の選択
     if columns is None:
@@ -263,9 +427,21 @@ def plot_pairplot(
         # hue列を追加
         plot_df = pd.concat([plot_df, df[hue]], axis=1)
 
+    plot_df = _maybe_sample(plot_df, max_points)
+
     # ペアプロットの描画
-    g = sns.pairplot(plot_df, hue=hue, diag_kind="kde")
-    g.fig.suptitle("ペアプロット", y=1.02)
+    import matplotlib.pyplot as plt
+
+    sns = _import_seaborn()
+
+    # 散布図部分のみラスタ化し、ベクター形式での保存サイズと時間を抑える
+    if sns is not None:
+        g = sns.pairplot(plot_df, hue=hue, diag_kind="kde", plot_kws={"rasterized": True})
+        g.fig.suptitle("ペアプロット", y=1.02)
+    else:
+        # scatter_matrixは色分けに対応していないため、数値列のみを描画する
+        pd.plotting.scatter_matrix(plot_df, figsize=(12, 12), diagonal="kde", rasterized=True)
+        plt.suptitle("ペアプロット", y=1.02)
 
     if output_path:
         plt.savefig(output_path, dpi=300, bbox_inches="tight")
@@ -276,6 +452,43 @@ def plot_pairplot(
     plt.close()
 
 
+def _top_value_counts(series: pd.Series, n: int = 10) -> Tuple[pd.Series, int]:
+    """値ごとの度数を数え、度数の多い順に上位n個を返します。
+
+    ``value_counts().head(n)`` と同じ度数を、全体をソートせずに求めます。
+    値を整数コードに変換して ``np.bincount`` で数え、上位n個だけを並べます。
+    度数が同じ値は最初に現れた順に並べます。
+    category型の列は、使われていないカテゴリも度数0として含めるよう ``value_counts`` で数えます。
+
+    Args:
+        series: 度数を数える列。
+        n: 返す値の数。
+
+    Returns:
+        (値をインデックスとする上位n個の度数, 値の種類の数) のタプル。
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        value_counts = series.value_counts()
+        return value_counts.head(n), len(value_counts)
+
+    # 値を整数コードに変換してからカウント（欠損値のコードは-1）
+    codes, uniques = pd.factorize(series, sort=False)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+    if len(counts) > n:
+        # 全体をソートせず、n番目に多い度数より多い値と、同じ度数の値を現れた順に選ぶ
+        kth = np.partition(counts, len(counts) - n)[len(counts) - n]
+        above = np.flatnonzero(counts > kth)
+        ties = np.flatnonzero(counts == kth)[: n - len(above)]
+        top = np.concatenate([above, ties])
+    else:
+        top = np.arange(len(counts))
+    # コードは最初に現れた順に振られるため、安定ソートで同じ度数の値の順序を保つ
+    top = top[np.argsort(-counts[top], kind="stable")]
+
+    return pd.Series(counts[top], index=pd.Index(uniques[top], name=series.name), name="count"), len(counts)
+
+
 def plot_count(df: pd.DataFrame, column: str, output_path: Optional[str] = None) -> None:
     """カテゴリ列の度数を棒グラフで描画します。
 
@@ -287,18 +500,24 @@ def plot_count(df: pd.DataFrame, column: str, output_path: Optional[str] = None)
     if column not in df.columns:
         raise ValueError(f"列 '{column}' はデータフレームに存在しません。")
 
+    import matplotlib.pyplot as plt
+
+    sns = _import_seaborn()
+
     plt.figure(figsize=(12, 6))
 
     # 値の数をカウント
-    value_counts = df[column].value_counts()
+    value_counts, n_values = _top_value_counts(df[column], 10)
 
     # 値の数が多すぎる場合は上位10個のみ表示
-    if len(value_counts) > 10:
+    if n_values > 10:
         print(f"列 '{column}' の値が10個以上あるため、上位10個のみ表示します。")
-        value_counts = value_counts.head(10)
 
     # 棒グラフの描画
-    sns.barplot(x=value_counts.index, y=value_counts.values)
+    if sns is not None:
+        sns.barplot(x=value_counts.index, y=value_counts.values)
+    else:
+        plt.bar(value_counts.index.astype(str), value_counts.values)
 
     plt.title(f"{column} の度数分布")
     plt.xlabel(column)
@@ -315,17 +534,88 @@ def plot_count(df: pd.DataFrame, column: str, output_path: Optional[str] = None)
     plt.close()
 
 
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """LTTB（Largest-Triangle-Three-Buckets）法で残す点のインデックスを求めます。
+
+    先頭と末尾の点を残し、残りをバケットに分けて、前に選んだ点と
+    次のバケットの平均点で作る三角形の面積が最大となる点を各バケットから選びます。
+
+    Args:
+        x: X座標（昇順）。
+        y: Y座標。
+        n_out: 残す点の数。
+
+    Returns:
+        残す点のインデックス。
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def _lttb_downsample(x: pd.Series, y: pd.Series, n_out: int = LTTB_POINTS) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """時系列データをLTTB法で見た目を保ったまま間引きます。
+
+    欠損値を含む点は除外します。
+
+    Args:
+        x: 日付（昇順）。
+        y: 値。
+        n_out: 残す点の数。
+
+    Returns:
+        間引いた後の日付と値のタプル。
+    """
+    x = pd.DatetimeIndex(x).as_unit("ns")
+    y = pd.Series(y).to_numpy(dtype=float, na_value=np.nan)
+
+    valid = ~(np.isnan(y) | x.isna())
+    x, y = x[valid], y[valid]
+    if len(x) <= n_out:
+        return x, y
+
+    indices = _lttb_indices(x.asi8.astype(np.float64), y, n_out)
+    return x[indices], y[indices]
+
+
 def plot_time_series(
-    df: pd.DataFrame, date_column: str, value_column: str, freq: Optional[str] = None, output_path: Optional[str] = None
+    df: pd.DataFrame,
+    date_column: str,
+    value_column: str,
+    freq: Optional[str] = None,
+    output_path: Optional[str] = None,
+    max_points: int = LTTB_POINTS,
 ) -> None:
     """時系列データを折れ線グラフで描画します。
 
+    点数が ``max_points`` を超える場合は、LTTB法で形状を保ったまま ``max_points`` 点に間引いて描画します。
+
     Args:
         df: データフレーム。
         date_column: 日付列の名前。
         value_column: 値列の名前。
         freq: リサンプリングの頻度（例: 'D', 'W', 'M'）。Noneの場合はリサンプリングしない。
         output_path: 出力ファイルのパス。Noneの場合は表示のみ。
+        max_points: 描画する最大の点数。0以下の場合は間引かずにすべての点を描画する。
     """
     if date_column not in df.columns:
         raise ValueError(f"列 '{date_column}' はデータフレームに存在しません。")
@@ -342,21 +632,32 @@ def plot_time_series(
     except Exception as e:
         raise ValueError(f"列 '{date_column}' を日付型に変換できません: {e}")
 
-    # データをソート
-    df = df.sort_values(by=date_column)
-
-    # リサンプリング
     if freq is not None:
-        df_resampled = df.set_index(date_column).resample(freq)[value_column].mean().reset_index()
-        x = df_resampled[date_column]
-        y = df_resampled[value_column]
+        # リサンプリング（データフレーム全体をコピーしないよう、必要な2列だけからSeriesを作る）
+        series = pd.Series(df[value_column].to_numpy(), index=pd.DatetimeIndex(df[date_column]), name=value_column)
+        if not series.index.is_monotonic_increasing:
+            series = series.sort_index()
+        resampled = series.resample(freq).mean()
+        x = resampled.index
+        y = resampled.to_numpy()
     else:
+        # 日付順に並んでいない場合のみソート
+        if not df[date_column].is_monotonic_increasing:
+            df = df.sort_values(by=date_column, kind="mergesort")
         x = df[date_column]
         y = df[value_column]
 
     # 折れ線グラフの描画
+    import matplotlib.pyplot as plt
+
+    # 点が多い場合はLTTB法で間引き、マーカーも省略する
+    if max_points > 0 and len(x) > max_points:
+        print(f"データが{len(x)}点あるため、LTTB法で{max_points}点に間引いて描画します。")
+        x, y = _lttb_downsample(x, y, max_points)
+    marker = "o" if len(x) <= MARKER_MAX_POINTS else None
+
     plt.figure(figsize=(12, 6))
-    plt.plot(x, y, marker="o", linestyle="-", markersize=4)
+    plt.plot(x, y, marker=marker, linestyle="-", markersize=4, rasterized=True)
 
     plt.title(f"{value_column} の時系列変化")
     plt.xlabel(date_column)
@@ -391,13 +692,37 @@ def main() -> None:
     parser.add_argument("--hue", help="色分けする列名")
     parser.add_argument("--date", help="時系列グラフの日付列名")
     parser.add_argument("--freq", help="時系列データのリサンプリング頻度（例: 'D', 'W', 'M'）")
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR, help=f"読み込んだデータのキャッシュ先（デフォルト: {DEFAULT_CACHE_DIR}）"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="キャッシュを使用しない")
+    parser.add_argument("--dtypes", metavar="PATH", help="列名とデータ型の対応を記述したJSONファイルのパス")
+    parser.add_argument("--no-downcast", action="store_true", help="数値列をfloat32などに縮小せず元の精度で扱う")
     parser.add_argument("--output", "-o", help="出力ファイルのパス")
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        help=(
+            "描画する最大の点数（デフォルト: 散布図・ペアプロットは"
+            f"{DEFAULT_MAX_POINTS}、時系列グラフは{LTTB_POINTS}、-1で無効）"
+        ),
+    )
 
     args = parser.parse_args()
 
     try:
         # データの読み込み
-        df = load_data(args.file_path)
+        dtypes = None
+        if args.dtypes:
+            with open(args.dtypes, encoding="utf-8") as f:
+                dtypes = json.load(f)
+
+        cache_dir = None if args.no_cache else args.cache_dir
+        df = load_data(args.file_path, cache_dir=cache_dir, dtypes=dtypes)
+
+        # 数値列のデータ型を縮小してメモリ帯域を節約
+        if not args.no_downcast:
+            df = downcast(df)
 
         # プロットスタイルの設定
         setup_plot_style()
@@ -416,14 +741,16 @@ def main() -> None:
         elif args.type == "scatter":
             if args.x is None or args.y is None:
                 raise ValueError("散布図には --x と --y オプションが必要です。")
-            plot_scatter(df, args.x, args.y, hue=args.hue, output_path=args.output)
+            max_points = DEFAULT_MAX_POINTS if args.max_points is None else args.max_points
+            plot_scatter(df, args.x, args.y, hue=args.hue, output_path=args.output, max_points=max_points)
 
         elif args.type == "corr":
             plot_correlation_heatmap(df, output_path=args.output)
 
         elif args.type == "pair":
             columns = args.column.split(",") if args.column else None
-            plot_pairplot(df, columns=columns, hue=args.hue, output_path=args.output)
+            max_points = DEFAULT_MAX_POINTS if args.max_points is None else args.max_points
+            plot_pairplot(df, columns=columns, hue=args.hue, output_path=args.output, max_points=max_points)
 
         elif args.type == "count":
             if args.column is None:
@@ -433,7 +760,8 @@ def main() -> None:
         elif args.type == "time":
             if args.date is None or args.column is None:
                 raise ValueError("時系列グラフには --date と --column オプションが必要です。")
-            plot_time_series(df, args.date, args.column, freq=args.freq, output_path=args.output)
+            max_points = LTTB_POINTS if args.max_points is None else args.max_points
+            plot_time_series(df, args.date, args.column, freq=args.freq, output_path=args.output, max_points=max_points)
 
     except Exception as e:
         print(f"エラーが発生しました: {e}")